@@ -0,0 +1,717 @@
+"""The Friendship Package page, shared by both entry scripts.
+
+``app.py`` (cloud, HTML only) and ``app_local.py`` (PDF and HTML) differ
+only in which contract formats they offer; each calls ``main()`` with its
+formats. Formats come from the registry in exporters.py, which imports a
+renderer the first time a contract in that format is built, so startup and
+reruns never pay for exporters nobody has used yet.
+
+This module is imported once per process, while the entry script reruns on
+every interaction. Everything that must be fresh per run (session state,
+the timer, environment-driven settings) is therefore read inside functions,
+not at import.
+"""
+import functools
+import os
+import uuid
+from datetime import datetime
+
+import streamlit as st
+
+from catalog import CATALOG_SEED, CATALOG_VERSION
+from catalog_file import open_catalog
+from contracts import ContractCache, manifest_fingerprint, selection_fingerprint
+from exporters import get_exporter
+from exports import ExportPool
+from sampler import draw_rights
+from search import SearchIndex
+from selection import Selection, SelectionLog, catalog_stamp, decode_state, encode_state
+from store import SelectionStore
+from timing import NULL_TIMER, PhaseTimer
+
+# --- Helper function to add styling ---
+def local_css():
+    st.markdown("""
+    <style>
+    /* Mobile-Friendly Buttons */
+    .stButton>button {
+        background-color: #4CAF50;
+        color: white;
+        border-radius: 8px;
+        padding: 12px 20px;
+        font-weight: bold;
+        border: none;
+        width: 100%;
+        margin-bottom: 10px;
+    }
+    .stButton>button:hover {
+        background-color: #45a049;
+    }
+
+    /* Clean Inputs */
+    .stTextInput>div>div>input {
+        border-radius: 8px;
+    }
+
+    </style>
+    """, unsafe_allow_html=True)
+
+# --- Performance Instrumentation ---
+# Off unless RIGHTS_PERF=1 is set or the page is opened with ?perf=1
+# (checked once per session). When off, every timer call is a no-op.
+PERF_ENABLED = os.environ.get("RIGHTS_PERF") == "1"
+PERF_LOG = os.environ.get("RIGHTS_PERF_LOG", "perf_log.jsonl")
+
+def get_timer():
+    timer = st.session_state.get("perf_timer")
+    if timer is None:
+        enabled = PERF_ENABLED or st.query_params.get("perf") == "1"
+        timer = PhaseTimer(PERF_LOG) if enabled else NULL_TIMER
+        st.session_state.perf_timer = timer
+    return timer
+
+def timed_run(kind):
+    """Time a whole script run or fragment rerun as one run of ``kind``."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            timer = get_timer()
+            with timer.run(kind), timer.phase(kind):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def perf_sidebar(timer):
+    if not timer.enabled:
+        return
+    st.sidebar.subheader("⏱️ Phase Timings")
+    st.sidebar.caption(f"Session {timer.session_id}, logging to {PERF_LOG}. Fragment reruns show up on the next full run.")
+    rows = []
+    for record in reversed(timer.runs):
+        row = {"run": record["run"], "kind": record["kind"]}
+        for p in record["phases"]:
+            row[p["phase"]] = p["ms"]
+        rows.append(row)
+    st.sidebar.dataframe(rows, hide_index=True)
+
+# --- Data Generation ---
+# The catalog is a packed file under data/ (see catalog_file.py), built on
+# first use and memory-mapped by every process; rows decode only when a page
+# shows them. Every session and rerun shares the same read-only mapping.
+# RIGHTS_CATALOG_SIZE pads the catalog with synthetic rights, so the
+# benchmarks and load tests can run the real app at scale; it is read per
+# call, since the benchmarks restart the app at several sizes in one process.
+# After editing data/rights.json, rewrite the file with
+# ``python catalog_file.py`` and restart the server: a running one keeps the
+# catalog it mapped at startup.
+def catalog_size():
+    return int(os.environ.get("RIGHTS_CATALOG_SIZE", 0)) or None
+
+@st.cache_resource(show_spinner=False)
+def load_catalog(version=CATALOG_VERSION, seed=CATALOG_SEED, size=None):
+    return open_catalog(version, seed, size)
+
+@st.cache_resource(show_spinner=False)
+def load_index(version=CATALOG_VERSION, seed=CATALOG_SEED, size=None):
+    return load_catalog(version, seed, size).catalog_index()
+
+@st.cache_resource(show_spinner=False)
+def load_search_index(version=CATALOG_VERSION, seed=CATALOG_SEED, size=None):
+    # Built on the first search rather than at startup, since it has to
+    # decode every text.
+    return SearchIndex(load_catalog(version, seed, size).texts())
+
+def all_rights():
+    return load_catalog(size=catalog_size())
+
+def catalog_index():
+    return load_index(size=catalog_size())
+
+def search_index():
+    return load_search_index(size=catalog_size())
+
+def current_stamp():
+    rights = all_rights()
+    return catalog_stamp(CATALOG_VERSION, CATALOG_SEED, len(rights), rights.digest)
+
+# --- Right IDs ---
+# A right's ID is its canonical catalog position; a session's custom rights
+# are numbered after the catalog. The selection stores IDs in a bitset, so
+# it iterates in catalog order and the exporters never have to sort. It and
+# the custom rights are all a session keeps; the catalog and its indexes are
+# shared read-only by every session of the server.
+CUSTOM_CATEGORY = "Custom"
+
+def right_text(right_id, rights):
+    if right_id < len(rights):
+        return rights[right_id]['text']
+    return st.session_state.custom_rights[right_id - len(rights)]
+
+def right_category(right_id, rights):
+    if right_id < len(rights):
+        return rights[right_id]['category']
+    return CUSTOM_CATEGORY
+
+# --- Saved Selections ---
+# Picks survive refreshes and restarts: the URL carries an opaque session id
+# (?sid=) under which the store keeps the latest selection, and a share link
+# (?s=) carries the whole selection itself, so opening it needs no lookup.
+# The sid is this browser's own: the page URL with it opens, and keeps
+# editing, the same stored selection, so the Share Link button builds its
+# link without it, and the UI says to share that link instead.
+STORE_PATH = os.environ.get("RIGHTS_STORE", "selections.db")
+
+@st.cache_resource(show_spinner=False)
+def load_selection_store(path=STORE_PATH):
+    return SelectionStore(path)
+
+def restore_selection():
+    """Return (selection, custom rights) from a share link, the store, or empty."""
+    params = st.query_params
+    if "sid" not in params:
+        params["sid"] = uuid.uuid4().hex
+    st.session_state.store_id = params["sid"]
+    restored = None
+    if "s" in params:
+        try:
+            restored = decode_state(params["s"], current_stamp(), len(all_rights()))
+        except ValueError as e:
+            st.warning(f"Couldn't open the shared selection: {e}")
+        # Edits from here on belong to this session, not to the link.
+        del params["s"]
+    if restored is None:
+        restored = load_selection_store().load(st.session_state.store_id, current_stamp(), len(all_rights()))
+    return restored or (Selection(), [])
+
+def save_selection():
+    """Queue the selection for the store if it changed since the last save."""
+    selection, custom = st.session_state.selection, st.session_state.custom_rights
+    snapshot = (selection.to_bytes(), len(custom))
+    if snapshot != st.session_state.get("saved_snapshot"):
+        st.session_state.saved_snapshot = snapshot
+        load_selection_store().save(st.session_state.store_id, selection, custom, current_stamp())
+        if snapshot != st.session_state.get("claimed_state"):
+            cancel_exports()
+
+def share_callback():
+    token = encode_state(st.session_state.selection, st.session_state.custom_rights, current_stamp())
+    base = (st.context.url or "").split("?")[0]
+    st.session_state.share_url = f"{base}?s={token}"
+
+# --- Contract Files ---
+# ``formats`` maps each offered format (an exporters.py kind) to the
+# keyword arguments its renderer gets, e.g. a different signer. Formats that
+# list the rights' IDs and categories (the bundle's manifest) also get the
+# claimed ``manifest``, and a digest of it joins their cache key: the same
+# texts can come with other IDs, e.g. a custom right repeating a catalog one.
+# A composite format (the bundle) is given the other formats' own options
+# and copies their cached contracts instead of rendering them again.
+def discard_contract(value):
+    discard = getattr(value, "discard", None)
+    if discard:
+        discard()
+
+@st.cache_resource(show_spinner=False)
+def load_contract_cache():
+    return ContractCache(max_entries=32, on_evict=discard_contract)
+
+def bundled_kinds(kind, formats):
+    """The formats the composite ``kind`` packs: its ``contracts``, or all the others."""
+    kinds = formats[kind].get("contracts")
+    return kinds if kinds is not None else [k for k in formats if not get_exporter(k).composite]
+
+def contract_options(kind, formats):
+    """``formats[kind]``, with each bundled format's own options for a composite."""
+    options = formats[kind]
+    if get_exporter(kind).composite:
+        # Hashable, since the options are part of the cache key.
+        options = dict(options, contracts=tuple(
+            (k, tuple(sorted(formats[k].items()))) for k in bundled_kinds(kind, formats)
+        ))
+    return options
+
+def open_contract(value):
+    """A reader on a file-backed contract; other contracts as they are."""
+    return value.open() if hasattr(value, "open") else value
+
+def build_contract(kind, selected_rights, options, timer=NULL_TIMER, progress=None, manifest=None,
+                   reader=False):
+    """Render a contract, reusing any earlier render of the same selection.
+
+    With ``reader``, a file-backed contract comes back as a reader opened
+    while it was still cached, so an eviction can't free it first; the
+    caller closes it.
+    """
+    date_str = datetime.now().strftime("%Y-%m-%d")
+    key = (kind, tuple(sorted(options.items())), selection_fingerprint(selected_rights, date_str))
+    exporter = get_exporter(kind)
+    if exporter.manifest:
+        key += (manifest_fingerprint(manifest),)
+        options = dict(options, manifest=manifest)
+    if exporter.composite:
+        options = dict(options, render=lambda k, o: build_contract(k, selected_rights, dict(o), timer, reader=True))
+    with timer.run("export"), timer.phase(f"export_{kind}", rights=len(selected_rights)):
+        return load_contract_cache().get_or_build(
+            key, lambda: exporter(selected_rights, date_str, progress=progress, **options),
+            open_contract if reader else None,
+        )
+
+def deferred_contract(kind, selected_rights, options, manifest=None):
+    # Handed to st.download_button, which only calls it when clicked.
+    timer = get_timer()
+
+    def load():
+        data = build_contract(kind, selected_rights, options, timer, manifest=manifest, reader=True)
+        # Streamlit reads the whole download into memory either way, so a
+        # file-backed contract is read here and its reader closed at once.
+        if hasattr(data, "read"):
+            with data:
+                return data.read()
+        return data
+    return load
+
+# --- Background Exports ---
+# Claiming renders every contract format on a worker pool shared by all sessions, into
+# the contract cache. The header polls the jobs, then shows the download
+# buttons, whose click is a cache hit. Jobs still running when the
+# selection changes are cancelled.
+EXPORT_WORKERS = int(os.environ.get("RIGHTS_EXPORT_WORKERS", 2))
+
+@st.cache_resource(show_spinner=False, on_release=ExportPool.shutdown)
+def load_export_pool(workers=EXPORT_WORKERS):
+    return ExportPool(max_workers=workers)
+
+def submit_exports(claimed, formats, manifest=None):
+    timer = get_timer()
+    pool = load_export_pool()
+    return {
+        kind: pool.submit(kind, len(claimed), lambda progress, kind=kind, options=options: build_contract(kind, claimed, options, timer, progress, manifest))
+        for kind, options in formats.items()
+        # Built from these when it is downloaded.
+        if not get_exporter(kind).composite
+    }
+
+def cancel_exports():
+    # Finished jobs are left alone; their contracts are still good.
+    for job in st.session_state.get("export_jobs", {}).values():
+        job.cancel()
+
+def export_ready(job):
+    """True if ``job`` produced its contract; otherwise say why not."""
+    label = get_exporter(job.kind).label
+    if job.state == "failed":
+        st.error(f"{label} export failed: {job.error}")
+    elif job.state == "cancelled":
+        st.warning(f"{label} export was cancelled because the selection changed. Claim again to export it.")
+    return job.state == "done"
+
+def format_ready(kind, jobs, formats):
+    """True if ``kind`` can be downloaded; a composite once all it packs is."""
+    if get_exporter(kind).composite:
+        return all(k in jobs and jobs[k].state == "done" for k in bundled_kinds(kind, formats))
+    return kind in jobs and export_ready(jobs[kind])
+
+@st.fragment(run_every=0.5)
+def export_progress():
+    jobs = st.session_state.export_jobs
+    for job in jobs.values():
+        st.progress(job.fraction, text=f"{get_exporter(job.kind).label}: {job.done} of {job.total} rights")
+    if all(job.finished for job in jobs.values()):
+        # Swap the progress bars for the download buttons.
+        st.rerun()
+
+# Only the current page of the grid is turned into widgets.
+PAGE_SIZES = [30, 60, 150, 300]
+
+def claim_callback(formats):
+    # Snapshot what was claimed; the grid can keep changing the live
+    # selection without this fragment having to rerun.
+    rights = all_rights()
+    claimed = [right_text(i, rights) for i in st.session_state.selection]
+    manifest = [(i, right_category(i, rights)) for i in st.session_state.selection]
+    st.session_state.claimed_keys = claimed
+    st.session_state.claimed_manifest = manifest
+    st.session_state.claimed_state = (st.session_state.selection.to_bytes(), len(st.session_state.custom_rights))
+    cancel_exports()
+    st.session_state.export_jobs = submit_exports(claimed, formats, manifest)
+    st.session_state.show_download = True
+
+def sync_claim_header():
+    """Rerun the whole page when the claim button's enabled state is stale.
+
+    The header is its own fragment, so grid toggles don't rerun it. The live
+    count is written to the header's counter slot by the grid, but the claim
+    button must not stay disabled with rights selected (or enabled with
+    none), so only that transition pays for a full rerun.
+    """
+    has_selection = len(st.session_state.selection) > 0
+    if has_selection != st.session_state.header_has_selection:
+        st.rerun()
+
+@st.fragment
+@timed_run("claim_header")
+def claim_header(formats):
+    # --- TOP AREA: CLAIM & DOWNLOAD ---
+    # This prevents scrolling down to find success message.
+
+    count = len(st.session_state.selection)
+    st.session_state.header_has_selection = count > 0
+
+    col_t1, col_t2 = st.columns([1, 2])
+
+    with col_t1:
+        # Show claim button if not yet claimed or to re-claim.
+        # The count itself is shown live in the counter slot below.
+        if count > 0:
+             st.button("🚀 Claim Selected", on_click=claim_callback, args=(formats,), type="primary", key="top_claim")
+        else:
+             st.button("🚀 Claim Selected", disabled=True, key="top_claim_disabled")
+        st.button("🔗 Share Link", on_click=share_callback, key="share_link",
+                  help="The address bar links to your own saved picks; anyone opening it edits them too.")
+        if st.session_state.get("share_url"):
+            st.caption("Opens a copy of this selection as of when you clicked (share this, not the address bar):")
+            st.code(st.session_state.share_url, language=None)
+
+    with col_t2:
+        claimed = st.session_state.claimed_keys
+        jobs = st.session_state.export_jobs
+        if st.session_state.show_download and claimed and jobs:
+            if not all(job.finished for job in jobs.values()):
+                st.info(f"Preparing your contract ({len(claimed)} rights)...")
+                export_progress()
+            else:
+                st.success(f"Rights Claimed ({len(claimed)})! Choose format:")
+
+                # One button per format, in the order the script lists them.
+                # Rendered in the background; the click is served from the cache
+                # (a bundle is zipped from the cached contracts on its click).
+                for kind in formats:
+                    if format_ready(kind, jobs, formats):
+                        exporter = get_exporter(kind)
+                        st.download_button(
+                            label=exporter.button_label,
+                            data=deferred_contract(kind, claimed, contract_options(kind, formats),
+                                                   st.session_state.claimed_manifest),
+                            file_name=exporter.file_name,
+                            mime=exporter.mime
+                        )
+
+# --- Selection Changes ---
+# Every change to the selection is a callback that applies one delta through
+# the session's SelectionLog: a checkbox's on_change adds or drops its own
+# right, so a rerun does no work for the boxes that didn't change, and the
+# render loops only read the selection. The log is what Undo/Redo replay.
+def toggle_callback(key, right_id):
+    log = st.session_state.selection_log
+    if st.session_state[key]:
+        log.add(st.session_state.selection, right_id)
+    else:
+        log.discard(st.session_state.selection, right_id)
+
+def history_callback(step):
+    # step is "undo" or "redo"
+    if getattr(st.session_state.selection_log, step)(st.session_state.selection):
+        sync_checkboxes()
+        # The whole page reruns for this click anyway; without this the
+        # custom rights editor would see a changed count and rerun it again.
+        st.session_state.shown_total = len(st.session_state.selection)
+    else:
+        st.toast(f"Nothing to {step}.")
+
+def history_controls():
+    # Outside the fragments: a click reruns the whole page, so the header,
+    # the custom rights and the grid all show the restored selection. For
+    # the same reason the buttons can't know when the log runs empty, so
+    # they stay enabled.
+    h1, h2, _ = st.columns([1, 1, 6])
+    h1.button("↩️ Undo", on_click=history_callback, args=("undo",), key="history_undo")
+    h2.button("↪️ Redo", on_click=history_callback, args=("redo",), key="history_redo")
+
+@st.fragment
+@timed_run("custom_rights")
+def custom_rights_editor():
+    # --- Custom Rights ---
+    n_rights = len(all_rights())
+
+    def add_custom_right_callback():
+        new_right = st.session_state.custom_right_text
+        if new_right.strip():
+            st.session_state.custom_rights.append(new_right)
+            st.session_state.selection_log.add(st.session_state.selection, n_rights + len(st.session_state.custom_rights) - 1)
+            st.session_state.custom_right_text = ""
+
+    st.subheader("Add Your Own Custom Rights")
+    c1, c2 = st.columns([3, 1])
+    with c1:
+        st.text_input("Type right here:", key="custom_right_text", label_visibility="collapsed", placeholder="Enter your custom right...")
+    with c2:
+        st.button("Add Custom Right", on_click=add_custom_right_callback)
+
+    if st.session_state.custom_rights:
+        st.write("**Your Custom Additions:**")
+        selection = st.session_state.selection
+        for i, cr in enumerate(st.session_state.custom_rights):
+            right_id = n_rights + i
+            key = f"custom_{i}"
+            st.checkbox(cr, value=right_id in selection and key not in st.session_state, key=key,
+                        on_change=toggle_callback, args=(key, right_id))
+
+    save_selection()
+    # Typing stays inside this fragment; a change to the selection itself
+    # refreshes the page so the header and grid counters agree.
+    count = len(st.session_state.selection)
+    if count != st.session_state.get("shown_total", count):
+        st.session_state.shown_total = count
+        st.rerun()
+
+def search_hits(query):
+    """Positions matching ``query``, or None if it has no words to search for.
+
+    A blank query skips the search index, which is built on first use; one
+    made only of punctuation gets None from the index itself.
+    """
+    return search_index().search(query) if query.strip() else None
+
+def filter_positions(index, categories, query):
+    """Catalog positions matching the category filter and the search box.
+
+    Positions come back deduplicated and in catalog order from the index.
+    A search narrows them by walking its (usually much shorter) hit list.
+    """
+    hits = search_hits(query)
+    if hits is None:
+        return index.positions(categories)
+    allowed = index.position_set(categories)
+    return [p for p in hits if p in allowed]
+
+# --- Bulk Selection ---
+# Each action is one bitset operation on the selection (see selection.py),
+# so selecting a whole filter costs the same for ten rights or ten thousand.
+BULK_ACTIONS = {
+    "select": Selection.update,
+    "clear": Selection.difference_update,
+    "invert": Selection.symmetric_difference_update,
+}
+
+def bulk_callback(action, categories, query):
+    index = catalog_index()
+    if search_hits(query) is None:
+        ids = index.id_selection(categories)
+    else:
+        ids = Selection(index.canonical[p] for p in filter_positions(index, categories, query))
+    st.session_state.selection_log.apply(st.session_state.selection, BULK_ACTIONS[action], ids)
+    sync_checkboxes()
+
+# --- Surprise Me ---
+# A weighted random draw of rights not yet selected (see sampler.py), added
+# to the selection as one undoable step. The weights and the optional seed
+# are widgets read from session state when the button is clicked. The
+# callback runs in a fragment rerun, where it can't display anything, so it
+# leaves its message for surprise_controls to show.
+SURPRISE_COUNTS = [1, 3, 5, 10, 25, 50]
+
+def surprise_callback():
+    index = catalog_index()
+    weights = {c: st.session_state.get(f"surprise_weight_{c}", 1) for c in index.categories}
+    drawn = draw_rights(index, weights, st.session_state.surprise_count,
+                        seed=st.session_state.get("surprise_seed"), exclude=st.session_state.selection)
+    if not drawn:
+        st.session_state.surprise_message = "Nothing left to draw from those categories."
+        return
+    st.session_state.selection_log.apply(st.session_state.selection, Selection.update, Selection(drawn))
+    sync_checkboxes()
+    rights = all_rights()
+    st.session_state.surprise_message = (f"🎲 Added {len(drawn)}: " + "; ".join(rights[i]['text'] for i in drawn[:3])
+                                         + (" ..." if len(drawn) > 3 else ""))
+
+def surprise_controls(index):
+    message = st.session_state.pop("surprise_message", None)
+    if message:
+        st.toast(message)
+    with st.expander("🎲 Surprise me"):
+        st.caption("Draw random rights you haven't picked yet. Each category's weight is its share of "
+                   "the draw; 0 leaves it out. The same seed gives the same draw.")
+        for col, cat in zip(st.columns(len(index.categories)), index.categories):
+            col.number_input(cat, min_value=0, max_value=10, value=1, step=1, key=f"surprise_weight_{cat}")
+        s1, s2, s3 = st.columns([1, 1, 1])
+        s1.selectbox("How many:", SURPRISE_COUNTS, index=2, key="surprise_count")
+        s2.number_input("Seed (optional):", min_value=0, value=None, step=1, key="surprise_seed")
+        with s3:
+            st.button("🎲 Surprise me", on_click=surprise_callback, key="surprise_draw")
+
+def sync_checkboxes():
+    """Point the rights' checkboxes at the selection after it changed under them.
+
+    A checkbox that was on screen keeps its own widget state (in the browser
+    too), which wins over the ``value`` it is rendered with, so without this
+    it would keep showing the old tick. Only widgets from the last render
+    have state, so this is at most one page plus the custom rights.
+    """
+    selection = st.session_state.selection
+    n_rights = len(all_rights())
+    for key in list(st.session_state.keys()):
+        if key.startswith("right_"):
+            st.session_state[key] = int(key[len("right_"):]) in selection
+        elif key.startswith("custom_") and key[len("custom_"):].isdigit():
+            st.session_state[key] = n_rights + int(key[len("custom_"):]) in selection
+
+@st.fragment
+@timed_run("grid")
+def rights_grid(selection_counter):
+    rights = all_rights()
+    index = catalog_index()
+
+    # --- Filter UI ---
+    st.subheader(f"Browse the Archive ({len(rights)} Available)")
+
+    def reset_page():
+        st.session_state.grid_page = 1
+
+    query = st.text_input(
+        "Search the archive:", key="grid_search", on_change=reset_page,
+        placeholder="e.g. piggyback, karaoke, stargazing..."
+    )
+    categories = index.categories
+    selected_cats = st.multiselect(
+        "Filter by Category:", categories, default=categories, on_change=reset_page,
+        format_func=lambda c: f"{c} ({index.counts[c]})"
+    )
+
+    # --- Display Rights ---
+    timer = get_timer()
+    with timer.phase("filter") as counts:
+        filtered_positions = filter_positions(index, selected_cats, query)
+        if query.strip():
+            custom_hits = SearchIndex(st.session_state.custom_rights).search(query)
+            if custom_hits:
+                matches = ", ".join(st.session_state.custom_rights[i] for i in custom_hits)
+                st.caption(f"Also in your custom additions: {matches}")
+        counts["results"] = len(filtered_positions)
+
+    # --- Bulk Actions ---
+    # These cover every right the filter matches, on all pages, not just the
+    # checkboxes on screen.
+    filter_args = (tuple(selected_cats), query)
+    b1, b2, b3 = st.columns(3)
+    b1.button(f"✅ Select all {len(filtered_positions)} filtered", on_click=bulk_callback,
+              args=("select", *filter_args), disabled=not filtered_positions, key="bulk_select")
+    b2.button("✖️ Clear filtered", on_click=bulk_callback,
+              args=("clear", *filter_args), disabled=not filtered_positions, key="bulk_clear")
+    b3.button("🔁 Invert filtered", on_click=bulk_callback,
+              args=("invert", *filter_args), disabled=not filtered_positions, key="bulk_invert")
+    c1, c2 = st.columns([2, 1])
+    with c1:
+        bulk_category = st.selectbox(
+            "Whole category:", categories, key="bulk_category", label_visibility="collapsed",
+            format_func=lambda c: f"{c} ({index.counts[c]})"
+        )
+    with c2:
+        st.button("📂 Select whole category", on_click=bulk_callback,
+                  args=("select", (bulk_category,), ""), key="bulk_category_select")
+    surprise_controls(index)
+
+    # --- Pagination ---
+    # Selections live in the session's Selection, so rights on other pages stay
+    # selected without their checkboxes being created.
+    page_size = st.session_state.grid_page_size
+    n_pages = max(1, -(-len(filtered_positions) // page_size))
+    if st.session_state.grid_page > n_pages:
+        st.session_state.grid_page = n_pages
+
+    p1, p2 = st.columns([1, 1])
+    with p1:
+        st.selectbox("Rights per page:", PAGE_SIZES, key="grid_page_size")
+    with p2:
+        st.number_input(f"Page (of {n_pages}):", min_value=1, max_value=n_pages, step=1, key="grid_page")
+
+    start = (st.session_state.grid_page - 1) * page_size
+    page_positions = filtered_positions[start:start + page_size]
+    if page_positions:
+        st.caption(f"Showing {start + 1}-{start + len(page_positions)} of {len(filtered_positions)}")
+
+    # Display in columns
+    cols = st.columns(3)
+
+    with timer.phase("render_grid", widgets=len(page_positions)):
+        selection = st.session_state.selection
+        for i, pos in enumerate(page_positions):
+            right_id = index.canonical[pos]
+
+            col = cols[i % 3]
+
+            # Check if currently selected. Only a checkbox without widget
+            # state is seeded from the selection; one that has state shows
+            # that (see sync_checkboxes), and passing a value as well
+            # would count as setting it twice.
+            key = f"right_{right_id}"
+            is_selected = right_id in selection and key not in st.session_state
+
+            # Ticking runs toggle_callback; the loop itself only reads.
+            col.checkbox(rights[pos]['text'], value=is_selected, key=key,
+                         on_change=toggle_callback, args=(key, right_id))
+
+    # --- Footer ---
+    total = len(st.session_state.selection)
+    st.markdown("---")
+    st.caption(f"Total Selected: {total}")
+    st.session_state.shown_total = total
+    save_selection()
+
+    # The counter slot belongs to the header; writing to it from here keeps
+    # it live without rerunning the header fragment.
+    selection_counter.caption(f"Selected so far: **{total}**")
+    sync_claim_header()
+
+@timed_run("full")
+def main(formats):
+    """Render the page, offering a contract in each of ``formats``."""
+    st.set_page_config(layout="wide", page_title="The Premium Friendship Package", page_icon="🏆")
+    with get_timer().phase("css"):
+        local_css()
+
+    with get_timer().phase("catalog") as counts:
+        counts["rights"] = len(all_rights())
+        catalog_index()
+
+    if 'selection' not in st.session_state:
+        st.session_state.selection, st.session_state.custom_rights = restore_selection()
+    if 'selection_log' not in st.session_state:
+        st.session_state.selection_log = SelectionLog()
+    if 'custom_right_text' not in st.session_state:
+        st.session_state.custom_right_text = ""
+    # We remove 'rights_claimed' persistence toggle to solve scrolling/state issues
+    # Instead, we rely on immediate action buttons for download.
+
+    if 'grid_page_size' not in st.session_state:
+        st.session_state.grid_page_size = PAGE_SIZES[1]
+    if 'grid_page' not in st.session_state:
+        st.session_state.grid_page = 1
+
+    # Callback to handle top claim button without full page reload confusion
+    if 'show_download' not in st.session_state:
+        st.session_state.show_download = False
+    if 'claimed_keys' not in st.session_state:
+        st.session_state.claimed_keys = []
+        st.session_state.claimed_manifest = []
+    if 'export_jobs' not in st.session_state:
+        st.session_state.export_jobs = {}
+
+    st.header("🏆 2026th Season Friendship Package renewal 🏆")
+    st.write("You've unlocked the ultimate reward: 'Friend Rights'.")
+    st.info("Limit Removed: You can choose **UNLIMITED** rights. Go wild.")
+
+    # Each section is a fragment: interacting with one reruns only that
+    # section, not the whole page.
+    claim_header(formats)
+    selection_counter = st.empty()
+    history_controls()
+
+    st.markdown("---")
+
+    custom_rights_editor()
+
+    st.markdown("---")
+
+    rights_grid(selection_counter)
+
+    perf_sidebar(get_timer())
@@ -0,0 +1,113 @@
+"""Render contracts for many recipients at once, without Streamlit.
+
+Each line of the input file is one JSON object:
+
+    {"recipient": "Arsha", "signer": "Idiot Scientist", "rights": [0, 5, 97], "custom": ["Right to ..."]}
+
+``rights`` are catalog positions (the ids the app's index uses) and
+``custom`` is optional. Contracts are rendered on a process pool and written
+to the output directory, one file per line and format:
+
+    python batch_render.py selections.jsonl -o contracts/ --workers 8 --chunk-size 16
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from multiprocessing import Pool
+
+from catalog import CATALOG_SEED, CATALOG_VERSION
+from catalog_file import open_catalog
+from selection import Selection
+from contracts import RECIPIENT, SIGNER, STREAMING_PDF_THRESHOLD, create_pdf, write_html
+
+# Set in each worker by init_worker; every worker maps the same catalog file.
+_catalog = None
+_options = None
+
+def init_worker(version, seed, out_dir, formats, date_str):
+    global _catalog, _options
+    _catalog = open_catalog(version, seed)
+    _options = (out_dir, formats, date_str)
+
+def slugify(name):
+    return re.sub(r"[^A-Za-z0-9]+", "_", name).strip("_") or "contract"
+
+def render_job(job):
+    """Render one input line. Returns (line number, bytes written, error or None)."""
+    lineno, line = job
+    out_dir, formats, date_str = _options
+    try:
+        entry = json.loads(line)
+        recipient = entry.get("recipient", RECIPIENT)
+        signer = entry.get("signer", SIGNER)
+        rights = entry.get("rights", [])
+        bad = [i for i in rights if type(i) is not int or not 0 <= i < len(_catalog)]
+        if bad:
+            raise ValueError(f"not catalog IDs (0 to {len(_catalog) - 1}): {', '.join(map(repr, bad[:5]))}"
+                             + (f" and {len(bad) - 5} more" if len(bad) > 5 else ""))
+        # A Selection drops repeated IDs and yields them in catalog order.
+        selection = [_catalog[i]['text'] for i in Selection(rights)]
+        selection += entry.get("custom", [])
+        stem = os.path.join(out_dir, f"{lineno:06d}_{slugify(recipient)}")
+        written = 0
+        if "html" in formats:
+            with open(stem + ".html", "wb") as f:
+                write_html(f, selection, date_str, recipient=recipient, signer=signer)
+                written += f.tell()
+        if "pdf" in formats:
+            if len(selection) > STREAMING_PDF_THRESHOLD:
+                from pdf_stream import write_contract_pdf
+                with open(stem + ".pdf", "wb") as f:
+                    write_contract_pdf(f, selection, date_str, recipient=recipient, signer=signer)
+                    written += f.tell()
+            else:
+                pdf = create_pdf(selection, date_str, recipient=recipient, signer=signer)
+                with open(stem + ".pdf", "wb") as f:
+                    written += f.write(pdf)
+        return lineno, written, None
+    except Exception as e:
+        return lineno, 0, f"{type(e).__name__}: {e}"
+
+def read_jobs(path):
+    # Lines are streamed to the pool, so the input file is never fully loaded.
+    with open(path, encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            if line.strip():
+                yield lineno, line
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render contracts in bulk from a JSONL file of selections.")
+    parser.add_argument("input", help="JSONL file with one selection per line")
+    parser.add_argument("-o", "--out-dir", default="contracts", help="output directory (default: contracts)")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count(), help="worker processes (default: CPU count)")
+    parser.add_argument("-c", "--chunk-size", type=int, default=8, help="lines handed to a worker at a time (default: 8)")
+    parser.add_argument("-f", "--formats", nargs="+", choices=["html", "pdf"], default=["html", "pdf"])
+    parser.add_argument("--date", help="contract date, YYYY-MM-DD (default: today)")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    open_catalog(CATALOG_VERSION, CATALOG_SEED)  # build the file once, before the workers map it
+    init_args = (CATALOG_VERSION, CATALOG_SEED, args.out_dir, frozenset(args.formats), args.date)
+
+    done = failed = total_bytes = 0
+    start = time.perf_counter()
+    with Pool(args.workers, initializer=init_worker, initargs=init_args) as pool:
+        for lineno, written, error in pool.imap_unordered(render_job, read_jobs(args.input), args.chunk_size):
+            if error:
+                failed += 1
+                print(f"line {lineno}: {error}", file=sys.stderr)
+            else:
+                done += 1
+                total_bytes += written
+    elapsed = time.perf_counter() - start
+
+    rate = done / elapsed if elapsed else 0.0
+    print(f"Rendered {done} contracts ({failed} failed) in {elapsed:.2f}s "
+          f"with {args.workers} workers: {rate:.1f} contracts/s, {total_bytes / 2**20:.1f} MB written")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+"""Benchmark the app and its exporters at scaled catalog and selection sizes.
+
+Drives the real script headlessly with Streamlit's AppTest harness against
+synthetic catalogs (see ``RIGHTS_CATALOG_SIZE``) and records, per case:
+
+- catalog build: writing the packed catalog file for the size, once per
+  size and before any case runs, so cold starts never depend on what
+  data/ already holds
+- cold start: first script run with empty caches (catalog, indexes, UI)
+- rerun latency: median full rerun after ticking a checkbox
+- widget count: widgets instantiated by one run
+- peak memory: tracemalloc peak over a cold start plus a rerun
+- export time: HTML and PDF generation for the selection
+
+Results are written as JSON. Pass ``--compare`` with an earlier results
+file to flag timings that got slower than ``--tolerance`` allows:
+
+    python benchmarks/bench_app.py --out bench.json
+    python benchmarks/bench_app.py --out new.json --compare bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from catalog import CatalogIndex, build_catalog
+from catalog_file import open_catalog
+from contracts import STREAMING_PDF_THRESHOLD, create_html, create_pdf
+from pdf_stream import write_contract_pdf
+from selection import Selection
+
+CATALOG_SIZES = [1_000, 10_000, 100_000]
+SELECTION_SIZES = [10, 1_000, 50_000]
+WIDGET_TYPES = ["checkbox", "button", "download_button", "text_input", "multiselect", "selectbox", "number_input"]
+TIMED_METRICS = ["catalog_build_s", "cold_start_s", "rerun_s", "export_html_s", "export_pdf_s"]
+
+def clear_caches():
+    st.cache_resource.clear()
+    st.cache_data.clear()
+
+def widget_count(at):
+    return sum(len(at.get(t)) for t in WIDGET_TYPES)
+
+def build_catalog_file(catalog_size):
+    """Rewrite the packed catalog for ``catalog_size``; returns seconds taken."""
+    t0 = time.perf_counter()
+    open_catalog(size=catalog_size, rebuild=True)
+    return time.perf_counter() - t0
+
+def start_app(app_path, catalog_size, selection):
+    """Cold-start the app, then load ``selection`` (right IDs) into its session."""
+    os.environ["RIGHTS_CATALOG_SIZE"] = str(catalog_size)
+    clear_caches()
+    at = AppTest.from_file(app_path, default_timeout=600)
+    t0 = time.perf_counter()
+    at.run()
+    cold = time.perf_counter() - t0
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    at.session_state["selection"] = Selection(selection)
+    return at, cold
+
+def time_reruns(at, repeats):
+    times = []
+    for i in range(repeats):
+        box = at.checkbox[i % len(at.checkbox)]
+        box.set_value(not box.value)
+        t0 = time.perf_counter()
+        at.run()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times)
+
+def time_exports(selection):
+    t0 = time.perf_counter()
+    create_html(selection, "2026-01-01")
+    html_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    if len(selection) > STREAMING_PDF_THRESHOLD:
+        with tempfile.TemporaryFile() as out:
+            write_contract_pdf(out, selection, "2026-01-01")
+    else:
+        create_pdf(selection, "2026-01-01")
+    return html_s, time.perf_counter() - t0
+
+def run_case(app_path, catalog_size, selection_size, repeats, build_s):
+    catalog = build_catalog(size=catalog_size)
+    ids = Selection(CatalogIndex(catalog).canonical[:selection_size])
+    selection = [catalog[i]['text'] for i in ids]
+
+    at, cold = start_app(app_path, catalog_size, ids)
+    rerun = time_reruns(at, repeats)
+    widgets = widget_count(at)
+    html_s, pdf_s = time_exports(selection)
+
+    # Memory is measured in a separate pass so tracing doesn't skew timings.
+    tracemalloc.start()
+    at, _ = start_app(app_path, catalog_size, ids)
+    at.run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "catalog_size": catalog_size,
+        "selection_size": len(selection),
+        "catalog_build_s": round(build_s, 4),
+        "cold_start_s": round(cold, 4),
+        "rerun_s": round(rerun, 4),
+        "widgets": widgets,
+        "peak_mem_mb": round(peak / 2**20, 2),
+        "export_html_s": round(html_s, 4),
+        "export_pdf_s": round(pdf_s, 4),
+    }
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline_path, tolerance):
+    """Print timings slower than ``tolerance`` x baseline; return how many there were."""
+    with open(baseline_path) as f:
+        baseline = {(c["catalog_size"], c["selection_size"]): c for c in json.load(f)["cases"]}
+    regressions = 0
+    for case in results:
+        old = baseline.get((case["catalog_size"], case["selection_size"]))
+        if not old:
+            continue
+        for metric in TIMED_METRICS:
+            if old.get(metric) and case[metric] > old[metric] * tolerance:
+                regressions += 1
+                print(f"REGRESSION catalog={case['catalog_size']} selection={case['selection_size']} "
+                      f"{metric}: {old[metric]:.4f}s -> {case[metric]:.4f}s")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark app reruns and exports at scale.")
+    parser.add_argument("--app", default=os.path.join(ROOT, "app_local.py"), help="script to drive (default: app_local.py)")
+    parser.add_argument("--catalog-sizes", type=int, nargs="+", default=CATALOG_SIZES)
+    parser.add_argument("--selection-sizes", type=int, nargs="+", default=SELECTION_SIZES)
+    parser.add_argument("--repeats", type=int, default=5, help="reruns per case (median is reported)")
+    parser.add_argument("--out", default="bench_results.json", help="where to write the JSON results")
+    parser.add_argument("--compare", help="earlier results file to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=1.25, help="allowed slowdown vs --compare (default: 1.25x)")
+    args = parser.parse_args()
+
+    cases = []
+    for catalog_size in args.catalog_sizes:
+        build_s = build_catalog_file(catalog_size)
+        for selection_size in args.selection_sizes:
+            if selection_size > catalog_size:
+                continue
+            case = run_case(os.path.abspath(args.app), catalog_size, selection_size, args.repeats, build_s)
+            cases.append(case)
+            print(json.dumps(case))
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "streamlit": st.__version__,
+        "app": os.path.basename(args.app),
+        "cases": cases,
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {len(cases)} cases to {args.out}")
+
+    if args.compare and compare(cases, args.compare, args.tolerance):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Peak memory of the PDF writer into a BytesIO vs into a temporary file.
+
+Run from the repository root:
+
+    python benchmarks/bench_pdf_memory.py [--sizes 100 1000 10000 50000]
+
+Both columns run the same streaming writer (pdf_stream.py) and differ only
+in where the pages go: ``create_pdf`` writes into a ``BytesIO``, so its
+peak includes the finished document and grows with the selection, while
+the temporary file (what the app uses above ``STREAMING_PDF_THRESHOLD``
+rights) keeps only the page being laid out and should stay roughly flat.
+
+Peak memory is measured with tracemalloc and excludes the selection itself
+and the fonts, which are parsed once per process before anything is timed.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from contracts import create_pdf
+from pdf_stream import FONTS, write_contract_pdf
+from ttfont import load_font
+
+def make_selection(n):
+    return [f"Right to benchmark entry #{i}, which is long enough to wrap onto a second line of the contract." for i in range(n)]
+
+def measure(fn):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+def run_bytesio(selection):
+    create_pdf(selection, "2026-01-01")
+
+def run_tempfile(selection):
+    with tempfile.TemporaryFile() as out:
+        write_contract_pdf(out, selection, "2026-01-01")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 50000])
+    args = parser.parse_args()
+
+    # One-time setup, not part of either export.
+    for _, name in FONTS.values():
+        load_font(name)
+
+    print(f"{'rights':>8} | {'BytesIO peak':>12} {'time':>8} | {'file peak':>12} {'time':>8}")
+    for n in args.sizes:
+        selection = make_selection(n)
+        m_time, m_peak = measure(lambda: run_bytesio(selection))
+        s_time, s_peak = measure(lambda: run_tempfile(selection))
+        print(f"{n:>8} | {m_peak / 2**20:>9.2f} MB {m_time:>7.2f}s | {s_peak / 2**20:>9.2f} MB {s_time:>7.2f}s")
+
+if __name__ == "__main__":
+    main()
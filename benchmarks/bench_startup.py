@@ -0,0 +1,163 @@
+"""Import time and cold start of the app, checked against a budget.
+
+Every measurement runs in a fresh interpreter, so nothing is already
+imported or cached:
+
+- import: ``import streamlit`` and then ``import app_core`` (the part this
+  repository controls), plus which exporter modules the import pulled in;
+  none should be, since exporters.py loads them on first use
+- exporters: the first build of each registered format (its import plus
+  any one-time setup, such as parsing the PDF font) and a second build
+- cold start: the first AppTest run of each entry script (the page's own
+  imports, opening the catalog, the first render) and a rerun
+
+Medians over ``--repeats`` runs are printed and compared with the budgets;
+the exit status is 1 if any budget is exceeded or an exporter module was
+imported at startup:
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --repeats 5 --out startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Milliseconds; generous enough for a loaded CI machine.
+BUDGETS = {
+    "core_import_ms": 150,
+    "cold_start_ms": 1500,
+    "rerun_ms": 250,
+}
+
+# Modules only an exporter should import.
+LAZY_MODULES = ["pdf_stream", "ttfont", "bundle", "fpdf"]
+
+IMPORT_SCRIPT = """
+import json, sys, time
+t0 = time.perf_counter()
+import streamlit
+t1 = time.perf_counter()
+import app_core
+t2 = time.perf_counter()
+print(json.dumps({
+    "streamlit_import_ms": (t1 - t0) * 1000,
+    "core_import_ms": (t2 - t1) * 1000,
+    "loaded": [m for m in %r if m in sys.modules],
+}))
+"""
+
+EXPORTER_SCRIPT = """
+import json, time
+from exporters import EXPORTERS
+rights = ["Right to a benchmark, with a question?"] * 20
+result = {}
+for kind, exporter in EXPORTERS.items():
+    t0 = time.perf_counter()
+    exporter(rights, "2026-01-01")
+    t1 = time.perf_counter()
+    exporter(rights, "2026-01-01")
+    t2 = time.perf_counter()
+    result[kind] = {"first_ms": (t1 - t0) * 1000, "second_ms": (t2 - t1) * 1000}
+print(json.dumps(result))
+"""
+
+COLD_START_SCRIPT = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(%r, default_timeout=120)
+t0 = time.perf_counter()
+at.run()
+t1 = time.perf_counter()
+at.run()
+t2 = time.perf_counter()
+if at.exception:
+    raise SystemExit(at.exception[0].message)
+print(json.dumps({
+    "cold_start_ms": (t1 - t0) * 1000,
+    "rerun_ms": (t2 - t1) * 1000,
+    "loaded": [m for m in %r if m in sys.modules],
+}))
+"""
+
+def run_python(code, env):
+    """Run ``code`` in a fresh interpreter and parse the JSON it prints last."""
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, check=True,
+                         capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+def median_of(samples, key):
+    return round(statistics.median(s[key] for s in samples), 1)
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure import time and cold start against a budget.")
+    parser.add_argument("--repeats", type=int, default=3, help="fresh interpreters per measurement")
+    parser.add_argument("--out", help="write the results as JSON")
+    for name, default in BUDGETS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=float, default=default,
+                            help=f"budget (default: {default})")
+    args = parser.parse_args()
+    budgets = {name: getattr(args, name) for name in BUDGETS}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, RIGHTS_STORE=os.path.join(tmp, "selections.db"), PYTHONPATH=ROOT)
+        env.pop("RIGHTS_CATALOG_SIZE", None)
+        # Build the catalog file first, so a cold start measures opening it.
+        subprocess.run([sys.executable, "-c", "from catalog_file import open_catalog; open_catalog()"],
+                       cwd=ROOT, env=env, check=True)
+
+        imports = [run_python(IMPORT_SCRIPT % LAZY_MODULES, env) for _ in range(args.repeats)]
+        exporters = [run_python(EXPORTER_SCRIPT, env) for _ in range(args.repeats)]
+        apps = {}
+        for app in ("app.py", "app_local.py"):
+            script = COLD_START_SCRIPT % (os.path.join(ROOT, app), LAZY_MODULES)
+            apps[app] = [run_python(script, env) for _ in range(args.repeats)]
+
+    report = {
+        "streamlit_import_ms": median_of(imports, "streamlit_import_ms"),
+        "core_import_ms": median_of(imports, "core_import_ms"),
+        "exporters": {
+            kind: {m: round(statistics.median(r[kind][m] for r in exporters), 1) for m in ("first_ms", "second_ms")}
+            for kind in exporters[0]
+        },
+        "apps": {
+            app: {"cold_start_ms": median_of(samples, "cold_start_ms"), "rerun_ms": median_of(samples, "rerun_ms")}
+            for app, samples in apps.items()
+        },
+        "budgets": budgets,
+    }
+
+    failures = []
+    print(f"import streamlit   {report['streamlit_import_ms']:>8.1f} ms")
+    print(f"import app_core    {report['core_import_ms']:>8.1f} ms  (budget {budgets['core_import_ms']:.0f})")
+    if report["core_import_ms"] > budgets["core_import_ms"]:
+        failures.append("core_import_ms")
+    for kind, t in report["exporters"].items():
+        print(f"exporter {kind:<9} {t['first_ms']:>8.1f} ms first build, {t['second_ms']:.1f} ms after")
+    for app, t in report["apps"].items():
+        print(f"{app:<18} {t['cold_start_ms']:>8.1f} ms cold start (budget {budgets['cold_start_ms']:.0f}), "
+              f"{t['rerun_ms']:.1f} ms rerun (budget {budgets['rerun_ms']:.0f})")
+        failures += [f"{app} {m}" for m in ("cold_start_ms", "rerun_ms") if t[m] > budgets[m]]
+    loaded = sorted({m for s in imports + [s for v in apps.values() for s in v] for m in s["loaded"]})
+    if loaded:
+        print(f"imported at startup: {', '.join(loaded)}")
+        failures.append("lazy exporters")
+    report["imported_at_startup"] = loaded
+    report["over_budget"] = failures
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.out}")
+    if failures:
+        print(f"OVER BUDGET: {', '.join(failures)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,290 @@
+"""Load-test a running app with many concurrent sessions.
+
+Starts the app under a real Streamlit server and drives it over the same
+websocket protocol the browser uses. Each simulated session opens the page,
+ticks random checkboxes on the grid (fragment reruns, as in a browser) and
+every few clicks claims its selection and downloads the HTML contract.
+
+For each session count it reports p50/p99 latency of the click reruns, the
+export round trip, and the server's resident memory (peak while the level
+ran, and after it settled):
+
+    python benchmarks/load_test.py --sessions 1 10 50 --clicks 20
+    python benchmarks/load_test.py --catalog-size 100000 --out load.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SESSION_COUNTS = [1, 5, 10, 25]
+DONE = {ForwardMsg.FINISHED_SUCCESSFULLY, ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY}
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def rss_mb(pid):
+    """Resident set size of ``pid`` from /proc (Linux only), or None."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+
+def percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q / 100 * len(values)))]
+
+def start_server(app_path, port, catalog_size, store_path):
+    env = dict(os.environ, RIGHTS_STORE=store_path)
+    if catalog_size:
+        env["RIGHTS_CATALOG_SIZE"] = str(catalog_size)
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", app_path, "--server.headless", "true",
+         "--server.port", str(port), "--browser.gatherUsageStats", "false"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1)
+            return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("streamlit server did not come up")
+
+class LostExport(Exception):
+    """The generated file was gone before it could be fetched.
+
+    Streamlit deletes a generated download on the second orphan sweep after
+    it is created, and every session's script runs trigger sweeps, so under
+    load a fetch can lose that race. Counted separately from failures.
+    """
+
+class Session:
+    """One simulated browser tab: tracks the widgets of the last render."""
+
+    def __init__(self, base_url, rng):
+        self.base_url = base_url
+        self.rng = rng
+        self.ws = None
+        self.session_id = ""
+        self.states = {}
+        self.checkboxes = {}
+        self.buttons = {}
+        self.downloads = {}
+        self.progress_fragment = None
+        self.query_string = ""
+
+    async def connect(self):
+        ws_url = self.base_url.replace("http", "ws", 1) + "/_stcore/stream"
+        self.ws = await websockets.connect(ws_url, subprotocols=["streamlit"], max_size=None)
+
+    async def close(self):
+        await self.ws.close()
+
+    def _record(self, delta):
+        el = delta.new_element
+        kind = el.WhichOneof("type")
+        if kind == "checkbox":
+            self.checkboxes[el.checkbox.id] = (delta.fragment_id, el.checkbox.default)
+        elif kind == "button":
+            self.buttons[el.button.label] = (delta.fragment_id, el.button.id)
+        elif kind == "progress":
+            self.progress_fragment = delta.fragment_id
+        elif kind == "download_button" and el.download_button.deferred_file_id:
+            self.downloads[el.download_button.label] = el.download_button.deferred_file_id
+
+    async def _receive(self, until):
+        while True:
+            msg = ForwardMsg()
+            msg.ParseFromString(await self.ws.recv())
+            kind = msg.WhichOneof("type")
+            if kind == "delta" and msg.delta.WhichOneof("type") == "new_element":
+                self._record(msg.delta)
+            elif kind == "new_session":
+                self.session_id = msg.new_session.initialize.session_id
+            elif kind == "page_info_changed":
+                self.query_string = msg.page_info_changed.query_string
+            if until(msg):
+                return msg
+
+    async def rerun(self, fragment_id="", trigger=None):
+        """Send one rerun with the current widget states and wait for it to finish."""
+        back = BackMsg()
+        rerun = back.rerun_script
+        rerun.query_string = self.query_string
+        rerun.fragment_id = fragment_id
+        for widget_id, value in self.states.items():
+            w = rerun.widget_states.widgets.add()
+            w.id = widget_id
+            w.bool_value = value
+        if trigger:
+            w = rerun.widget_states.widgets.add()
+            w.id = trigger
+            w.trigger_value = True
+        t0 = time.perf_counter()
+        await self.ws.send(back.SerializeToString())
+        # A fragment may end in st.rerun(); wait for the run that settles.
+        await self._receive(lambda m: m.WhichOneof("type") == "script_finished" and m.script_finished in DONE)
+        return time.perf_counter() - t0
+
+    async def click_checkbox(self):
+        widget_id = self.rng.choice(list(self.checkboxes))
+        fragment_id, default = self.checkboxes[widget_id]
+        self.states[widget_id] = not self.states.get(widget_id, default)
+        return await self.rerun(fragment_id)
+
+    async def export(self):
+        """Claim the selection and fetch the HTML contract; returns seconds or None."""
+        claim = self.buttons.get("🚀 Claim Selected")
+        # With nothing selected the header shows a disabled twin of the button.
+        if claim is None or claim[1].endswith("_disabled"):
+            return None
+        t0 = time.perf_counter()
+        self.downloads.clear()
+        self.progress_fragment = None
+        await self.rerun(*claim)
+        # Contracts render in the background; poll the progress fragment
+        # the way the browser's run_every timer does until they're ready.
+        while not self.downloads and self.progress_fragment:
+            fragment, self.progress_fragment = self.progress_fragment, None
+            await asyncio.sleep(0.5)
+            await self.rerun(fragment)
+        file_id = next((f for label, f in self.downloads.items() if "HTML" in label), None)
+        if file_id is None:
+            return None
+        back = BackMsg()
+        back.backend_operation_request.request_id = f"export-{time.monotonic_ns()}"
+        back.backend_operation_request.session_id = self.session_id
+        back.backend_operation_request.deferred_file.file_id = file_id
+        await self.ws.send(back.SerializeToString())
+        reply = await self._receive(lambda m: m.WhichOneof("type") == "backend_operation_response")
+        if reply.backend_operation_response.error_msg:
+            raise RuntimeError(f"export failed: {reply.backend_operation_response.error_msg}")
+        url = reply.backend_operation_response.deferred_file.url
+        try:
+            body = await asyncio.to_thread(lambda: urllib.request.urlopen(self.base_url + url).read())
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                raise LostExport() from None
+            raise
+        if b"<li>" not in body:
+            raise RuntimeError("exported contract lists no rights")
+        return time.perf_counter() - t0
+
+async def run_session(base_url, seed, clicks, export_every, results):
+    session = Session(base_url, random.Random(seed))
+    await session.connect()
+    try:
+        await session.rerun()
+        for i in range(1, clicks + 1):
+            results["click"].append(await session.click_checkbox())
+            if export_every and i % export_every == 0:
+                try:
+                    t = await session.export()
+                except LostExport:
+                    results["lost_exports"] += 1
+                    continue
+                if t is not None:
+                    results["export"].append(t)
+    finally:
+        await session.close()
+
+async def run_level(base_url, n_sessions, clicks, export_every, pid):
+    results = {"click": [], "export": [], "lost_exports": 0}
+    peak = rss_mb(pid) or 0.0
+    tasks = [
+        asyncio.create_task(run_session(base_url, seed, clicks, export_every, results))
+        for seed in range(n_sessions)
+    ]
+    t0 = time.perf_counter()
+    while not all(t.done() for t in tasks):
+        peak = max(peak, rss_mb(pid) or 0.0)
+        await asyncio.sleep(0.1)
+    elapsed = time.perf_counter() - t0
+    errors = [t.exception() for t in tasks if t.exception()]
+    return results, peak, elapsed, errors
+
+def ms(seconds):
+    return round(seconds * 1000, 1) if seconds is not None else None
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate concurrent sessions against a Streamlit server.")
+    parser.add_argument("--app", default=os.path.join(ROOT, "app_local.py"), help="script to serve (default: app_local.py)")
+    parser.add_argument("--sessions", type=int, nargs="+", default=SESSION_COUNTS, help="concurrent sessions per level")
+    parser.add_argument("--clicks", type=int, default=20, help="checkbox clicks per session")
+    parser.add_argument("--export-every", type=int, default=10, help="claim and download every N clicks (0: never)")
+    parser.add_argument("--catalog-size", type=int, help="pad the catalog to this many rights")
+    parser.add_argument("--port", type=int, help="server port (default: a free one)")
+    parser.add_argument("--out", help="write the results as JSON")
+    args = parser.parse_args()
+
+    port = args.port or free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    levels = []
+    with tempfile.TemporaryDirectory() as tmp:
+        server = start_server(os.path.abspath(args.app), port, args.catalog_size, os.path.join(tmp, "selections.db"))
+        try:
+            # Warm up: the first session pays for building the shared catalog.
+            asyncio.run(run_level(base_url, 1, 1, 0, server.pid))
+            baseline = rss_mb(server.pid)
+            print(f"server pid {server.pid}, idle RSS {baseline:.1f} MB")
+            print(f"{'sessions':>8} {'click p50':>10} {'click p99':>10} {'export p50':>11} "
+                  f"{'export p99':>11} {'lost':>5} {'peak RSS':>9} {'RSS after':>10} {'errors':>7}")
+            for n in args.sessions:
+                results, peak, elapsed, errors = asyncio.run(
+                    run_level(base_url, n, args.clicks, args.export_every, server.pid))
+                level = {
+                    "sessions": n,
+                    "clicks": len(results["click"]),
+                    "exports": len(results["export"]),
+                    "lost_exports": results["lost_exports"],
+                    "click_p50_ms": ms(statistics.median(results["click"]) if results["click"] else None),
+                    "click_p99_ms": ms(percentile(results["click"], 99)),
+                    "export_p50_ms": ms(statistics.median(results["export"]) if results["export"] else None),
+                    "export_p99_ms": ms(percentile(results["export"], 99)),
+                    "peak_rss_mb": round(peak, 1),
+                    "rss_after_mb": round(rss_mb(server.pid) or 0.0, 1),
+                    "elapsed_s": round(elapsed, 2),
+                    "errors": [repr(e) for e in errors],
+                }
+                levels.append(level)
+                print(f"{n:>8} {level['click_p50_ms']!s:>10} {level['click_p99_ms']!s:>10} "
+                      f"{level['export_p50_ms']!s:>11} {level['export_p99_ms']!s:>11} "
+                      f"{level['lost_exports']:>5} {level['peak_rss_mb']:>9} {level['rss_after_mb']:>10} {len(errors):>7}")
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+    if args.out:
+        report = {"app": os.path.basename(args.app), "catalog_size": args.catalog_size,
+                  "clicks_per_session": args.clicks, "baseline_rss_mb": baseline, "levels": levels}
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {len(levels)} levels to {args.out}")
+
+if __name__ == "__main__":
+    main()
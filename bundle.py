@@ -0,0 +1,151 @@
+"""Every contract format plus a manifest of the rights, in one ZIP.
+
+The archive is written into a ``SpooledTemporaryFile``: a small bundle stays
+in memory, a large one moves to disk once it passes ``SPOOL_MAX_SIZE``. Each
+entry is streamed into the archive as it is rendered, so a format with a
+streaming writer (see ``Exporter.write``) never exists as one byte string,
+and the manifest is written a row at a time.
+
+Each contract is rendered with its own options, e.g. the app's HTML signer,
+given as ``(kind, options)`` pairs in ``contracts``. The app also passes
+``render``, which returns the contract it already rendered for that kind and
+options, so the bundle only copies them into the archive.
+
+The manifest lists every right in contract order, as ``manifest.json`` and
+``manifest.csv``, with its 1-based number on the contract, its right ID and
+its category. The app passes the IDs and categories as ``manifest``, pairs
+aligned with ``selected_rights``; without them only the numbers and texts
+are filled in. The JSON header lists each contract file with the recipient
+and signer it was made out with, since formats can differ (the local app
+signs its HTML differently from its PDF).
+"""
+import csv
+import io
+import json
+import tempfile
+import threading
+import zipfile
+from datetime import datetime
+
+from contracts import RECIPIENT, SIGNER, SharedFile
+from exporters import copy_contract, get_exporter
+
+# Bundles up to this size never touch the disk.
+SPOOL_MAX_SIZE = 8 * 2**20
+
+BUNDLE_CONTRACTS = ("html", "pdf")
+MANIFEST_FIELDS = ["number", "id", "category", "text"]
+
+class BundleFile(SharedFile):
+    """A finished bundle in a spooled temporary file.
+
+    Like ``pdf_stream.PDFFile``, ``open()`` returns a fresh reader for each
+    download, and the spool is closed once the bundle has left the cache
+    and its last reader is closed (see ``SharedFile``). Readers keep their
+    own position and share the spool under a lock.
+    """
+
+    def __init__(self, spool, size):
+        super().__init__()
+        self.size = size
+        self._spool = spool
+        self._lock = threading.Lock()
+
+    def _raw_reader(self):
+        return _SpoolReader(self)
+
+    def _free(self):
+        with self._lock:
+            self._spool.close()
+
+    def _read_at(self, pos, size):
+        with self._lock:
+            self._spool.seek(pos)
+            return self._spool.read(size)
+
+class _SpoolReader(io.RawIOBase):
+    def __init__(self, bundle):
+        self._bundle = bundle
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: self._bundle.size}[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+
+    def tell(self):
+        return self._pos
+
+    def readinto(self, b):
+        data = self._bundle._read_at(self._pos, len(b))
+        b[:len(data)] = data
+        self._pos += len(data)
+        return len(data)
+
+def _passes_progress(progress, passes, total):
+    """Map each pass's count onto one 0..``total`` count for the whole bundle."""
+    if progress is None:
+        return lambda done_passes: None
+    return lambda done_passes: lambda done: progress((done_passes * total + done) // passes)
+
+def write_manifest(zf, selected_rights, manifest=None, progress=None, **header):
+    """Write ``manifest.json`` and ``manifest.csv`` into the open ``zf``."""
+    def rows():
+        pairs = manifest if manifest is not None else [(None, None)] * len(selected_rights)
+        for i, (text, (right_id, category)) in enumerate(zip(selected_rights, pairs)):
+            yield {"number": i + 1, "id": right_id, "category": category, "text": text}
+
+    with zf.open("manifest.json", "w") as raw, io.TextIOWrapper(raw, encoding="utf-8") as out:
+        # The header object, left open for a "rights" list written row by row.
+        out.write(json.dumps(header, ensure_ascii=False)[:-1] + ', "rights": [')
+        for i, row in enumerate(rows()):
+            out.write(("\n  " if i == 0 else ",\n  ") + json.dumps(row, ensure_ascii=False))
+        out.write("\n]}\n")
+
+    with zf.open("manifest.csv", "w") as raw, io.TextIOWrapper(raw, encoding="utf-8", newline="") as out:
+        writer = csv.DictWriter(out, MANIFEST_FIELDS)
+        writer.writeheader()
+        for row in rows():
+            writer.writerow(row)
+            if progress:
+                progress(row["number"])
+
+def create_bundle(selected_rights, date_str=None, recipient=RECIPIENT, signer=SIGNER, progress=None,
+                  manifest=None, contracts=BUNDLE_CONTRACTS, render=None):
+    """The contract in each of ``contracts`` plus the manifest, as a ``BundleFile``.
+
+    ``contracts`` lists kinds or ``(kind, options)`` pairs; the options
+    override ``recipient`` and ``signer`` for that contract. ``render(kind,
+    options)``, if given, returns an already rendered contract to copy in.
+    """
+    date_str = date_str or datetime.now().strftime("%Y-%m-%d")
+    names = {"recipient": recipient, "signer": signer}
+    contracts = [(c, {}) if isinstance(c, str) else (c[0], dict(c[1])) for c in contracts]
+    step = _passes_progress(progress, len(contracts) + 1, len(selected_rights))
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE, prefix="bundle_", suffix=".zip")
+    try:
+        with zipfile.ZipFile(spool, "w", zipfile.ZIP_DEFLATED) as zf:
+            files = []
+            for n, (kind, options) in enumerate(contracts):
+                exporter = get_exporter(kind)
+                contract_names = dict(names, **options)
+                with zf.open(exporter.file_name, "w") as out:
+                    if render is not None:
+                        copy_contract(render(kind, options), out)
+                    else:
+                        exporter.write(out, selected_rights, date_str, progress=step(n), **contract_names)
+                files.append({"file": exporter.file_name, **contract_names})
+            write_manifest(zf, selected_rights, manifest, step(len(contracts)),
+                           date=date_str, count=len(selected_rights), contracts=files)
+        size = spool.tell()
+    except BaseException:
+        # Failed or cancelled (see exports.py): drop whatever was written.
+        spool.close()
+        raise
+    return BundleFile(spool, size)
@@ -0,0 +1,375 @@
+"""Rights catalog shared by both app variants.
+
+The catalog is built by ``build_catalog`` from the hand-written rights in
+data/rights.json, less their near-duplicates (see dedupe.py), plus the
+generated "extra" rights. The build is seeded, so
+the same version and seed always give the same catalog; catalog_file.py packs
+the result into a file that the apps map instead of rebuilding it.
+"""
+import heapq
+import json
+import math
+import os
+import random
+import threading
+from array import array
+from collections.abc import Mapping, Sequence
+from itertools import islice
+
+from dedupe import canonical_rights
+from selection import Selection
+
+# Bump whenever the source lists or the generator change, so caches keyed on
+# the version pick up the new catalog.
+CATALOG_VERSION = 3
+CATALOG_SEED = 2026
+
+# --- Data Generation ---
+# The hand-written rights live in data/rights.json rather than in Python
+# literals; they are only read when a catalog is built, which happens once
+# per catalog file (see catalog_file.py), not on every import.
+SOURCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "rights.json")
+
+def load_source(path=SOURCE_PATH):
+    """Return ``(original, special)``: legacy right texts and categorized rows."""
+    with open(path, encoding="utf-8") as f:
+        source = json.load(f)
+    return source["original"], source["special"]
+
+def hand_written_rights(path=SOURCE_PATH):
+    """The rights from ``path`` as catalog rows, legacy ones first."""
+    original, special = load_source(path)
+    return [{"category": "Legacy", "text": r} for r in original] + list(special)
+
+def unique_combinations(parts, count, rng=random, batch_size=4096):
+    """Yield ``count`` distinct tuples (one item from each of ``parts``) in batches.
+
+    Every combination is a number in ``range(space)``, decoded digit by
+    digit with the part lengths as the radices. Walking ``i -> (a*i + b) %
+    space`` with ``a`` coprime to ``space`` visits each number at most once
+    in a seeded, shuffled-looking order, so no duplicate is ever drawn and
+    memory stays at one batch whatever the count.
+    """
+    space = math.prod(len(p) for p in parts)
+    if count > space:
+        raise ValueError(f"only {space} distinct combinations, {count} requested")
+    if space == 0:
+        return
+    a = rng.randrange(1, space) if space > 1 else 1
+    while math.gcd(a, space) != 1:
+        a = rng.randrange(1, space)
+    b = rng.randrange(space)
+    for start in range(0, count, batch_size):
+        batch = []
+        for i in range(start, min(start + batch_size, count)):
+            n = (a * i + b) % space
+            combo = []
+            for p in parts:
+                n, digit = divmod(n, len(p))
+                combo.append(p[digit])
+            batch.append(tuple(combo))
+        yield batch
+
+# (category, actions, objects): every pairing is one extra right.
+EXTRA_TEMPLATES = [
+    ("Foodie",
+     ["Steal my", "Demand we eat", "Veto", "Make me cook", "Judge my choice of", "Force me to try"],
+     ["Fries", "Pizza", "Sushi", "Chocolate", "Ice Cream", "Tacos", "Burgers", "Pasta", "Ramen", "Donuts"]),
+    ("Geek",
+     ["Debug my", "Roast my", "Upgrade my", "Borrow my", "Hack my (pretend)", "Use my"],
+     ["Code", "Laptop", "Discord", "Setup", "Phone", "Playlist", "Search History", "Wifi"]),
+    ("Media",
+     ["Make me watch a bad", "Explain the lore of a", "Skip the filler of a", "Sing the OP of a", "Cosplay a"],
+     ["Anime", "Movie", "Song", "Series", "Character", "Opening Track", "Ending Theory"]),
+    ("Adventure",
+     ["Drag me to the", "Get lost in the", "Take photos at the", "Run away to the", "People watch at the"],
+     ["Park", "Mall", "Roof", "Library", "Cafe", "Museum", "Beach", "Arcade"]),
+]
+
+def generate_extra_rights(rng=random):
+    """Every distinct action/object right of each template, in shuffled order."""
+    rights = []
+    for category, actions, objects in EXTRA_TEMPLATES:
+        count = len(actions) * len(objects)
+        for batch in unique_combinations([actions, objects], count, rng):
+            rights.extend(
+                {"category": category, "text": f"Right to {a.lower()} {o.lower()}."} for a, o in batch
+            )
+    return rights
+
+SYNTHETIC_CATEGORIES = ["Foodie", "Geek", "Media", "Adventure", "Romance", "Legacy"]
+SYNTHETIC_PARTS = [
+    ["borrow", "demand", "veto", "schedule", "review", "upgrade", "share", "plan",
+     "rename", "narrate", "rate", "photograph", "rehearse", "decorate", "sponsor", "judge"],
+    ["a snack run", "the playlist", "a movie night", "a code review", "a road trip", "the aux cord",
+     "a picnic", "the group chat", "a board game", "a bake-off", "the itinerary", "a pillow fort",
+     "a karaoke night", "the thermostat", "a photo dump", "the dessert menu"],
+    ["on a Monday", "at midnight", "before breakfast", "during exams", "on my birthday", "in the rain",
+     "on a long weekend", "after a bad day", "on a road trip", "at the mall", "on a video call",
+     "during a power cut", "in winter", "at the beach", "on payday", "twice a year"],
+]
+
+def synthetic_rights(n, rng=random):
+    """Yield ``n`` distinct made-up rights, for sizing the catalog in benchmarks and load tests.
+
+    Texts come from ``unique_combinations`` over ``SYNTHETIC_PARTS``; past
+    that space a round number is added as one more part, so every text is
+    still generated exactly once. Categories are drawn independently; they
+    aren't part of the text, so they can't make it unique.
+    """
+    base = math.prod(len(p) for p in SYNTHETIC_PARTS)
+    rounds = max(1, -(-n // base))
+    parts = SYNTHETIC_PARTS + [range(1, rounds + 1)]
+    for batch in unique_combinations(parts, n, rng):
+        for verb, thing, when, r in batch:
+            yield {"category": rng.choice(SYNTHETIC_CATEGORIES),
+                   "text": f"Right to {verb} {thing} {when}" + (f" (round {r})." if rounds > 1 else ".")}
+
+# --- Columnar storage ---
+# A catalog is stored column by column rather than as a dict per right: a
+# one-byte category code per row into a small name table, and every text
+# UTF-8 encoded back to back in one buffer with an offsets array. That is
+# the text itself plus five bytes a row, where a dict with its two strings
+# costs several hundred. Code written against rows of dicts keeps working:
+# indexing returns a ``RightRow`` view that decodes a field when it is read.
+class RightRow(Mapping):
+    """Read-only ``{"category": ..., "text": ...}`` view of one catalog row."""
+
+    __slots__ = ("_rows", "_pos")
+    _KEYS = ("category", "text")
+
+    def __init__(self, rows, pos):
+        self._rows = rows
+        self._pos = pos
+
+    def __getitem__(self, key):
+        if key == "text":
+            return self._rows.text(self._pos)
+        if key == "category":
+            return self._rows.category(self._pos)
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self._KEYS)
+
+    def __len__(self):
+        return len(self._KEYS)
+
+    def __repr__(self):
+        return f"RightRow({dict(self)!r})"
+
+class ColumnarRows(Sequence):
+    """Rows kept as columns; subclasses provide ``text(i)``, ``category(i)`` and ``__len__``.
+
+    ``categories`` is the name table and ``codes[i]`` the index of row
+    ``i``'s category in it.
+    """
+
+    def __getitem__(self, i):
+        n = len(self)
+        if isinstance(i, slice):
+            return [RightRow(self, j) for j in range(*i.indices(n))]
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("catalog index out of range")
+        return RightRow(self, i)
+
+    def category(self, i):
+        return self.categories[self.codes[i]]
+
+    def texts(self):
+        """Every text in catalog order, decoded one at a time."""
+        for i in range(len(self)):
+            yield self.text(i)
+
+class Catalog(ColumnarRows):
+    """An in-memory columnar catalog, filled by ``append``/``extend``.
+
+    ``build_catalog`` returns one; catalog_file.py writes its columns to a
+    file as they are.
+    """
+
+    def __init__(self, rights=()):
+        self.categories = []
+        self._code_of = {}
+        self.codes = array('B')
+        self.offsets = array('I', [0])
+        self.buffer = bytearray()
+        self.extend(rights)
+
+    def _new_code(self, category):
+        if len(self.categories) == 256:
+            raise ValueError("a catalog holds at most 256 categories")
+        code = self._code_of[category] = len(self.categories)
+        self.categories.append(category)
+        return code
+
+    def append(self, right):
+        self.extend((right,))
+
+    def extend(self, rights):
+        code_of, codes, offsets, buffer = self._code_of, self.codes, self.offsets, self.buffer
+        for right in rights:
+            code = code_of.get(right['category'])
+            if code is None:
+                code = self._new_code(right['category'])
+            codes.append(code)
+            buffer += right['text'].encode("utf-8")
+            offsets.append(len(buffer))
+
+    def __len__(self):
+        return len(self.codes)
+
+    def text(self, i):
+        return self.buffer[self.offsets[i]:self.offsets[i + 1]].decode("utf-8")
+
+    def texts(self):
+        buffer, offsets = self.buffer, self.offsets
+        for start, end in zip(offsets, islice(offsets, 1, None)):
+            yield buffer[start:end].decode("utf-8")
+
+def build_catalog(seed=CATALOG_SEED, version=CATALOG_VERSION, size=None, dedupe=True):
+    """Build the full rights catalog as a columnar ``Catalog``.
+
+    All randomness comes from a private ``random.Random`` seeded from
+    ``version`` and ``seed``, so the result is identical across reruns,
+    sessions and processes. Callers must treat the rows as read-only: the
+    app shares one catalog between all sessions.
+
+    Hand-written rights that near-duplicate an earlier one are dropped (see
+    dedupe.py) unless ``dedupe`` is false. The generated rights are distinct
+    by construction and differ in a word or two on purpose, so they are
+    left alone.
+
+    ``size`` cuts the catalog or pads it with ``synthetic_rights`` to exactly
+    that many rows; it exists for benchmarks and load tests.
+    """
+    rng = random.Random(f"{version}:{seed}")
+    rights = hand_written_rights()
+    if dedupe:
+        rights = canonical_rights(rights)
+    rights.extend(generate_extra_rights(rng))
+    if size is not None:
+        del rights[size:]
+    catalog = Catalog(rights)
+    if size is not None:
+        catalog.extend(synthetic_rights(size - len(catalog), rng))
+    return catalog
+
+class CatalogIndex:
+    """Category lookups over a built catalog.
+
+    Rights are identified by their position in the catalog. Each
+    category maps to its positions in catalog order with repeated texts
+    dropped, and the union for a combination of categories is computed once
+    and then reused, so filtering costs about as much as the result size.
+
+    ``canonical[pos]`` is the first position holding the same text. It is
+    the right's stable ID: selections store it, so a right picked under one
+    category filter stays picked when it is shown from another category.
+
+    A packed catalog file already holds ``canonical``, the per-category
+    positions and the all-categories union; passing them in skips the scan
+    over every row (see ``CatalogFile.catalog_index``).
+
+    One index is shared by every session of a server process. Its lists
+    are never mutated after construction, and the union caches are filled
+    under a lock, so concurrent sessions asking for the same new union wait
+    for one computation instead of each doing it.
+    """
+
+    def __init__(self, rights, canonical=None, by_category=None, all_positions=None):
+        self.rights = rights
+        if canonical is None:
+            canonical, by_category = self._scan(rights)
+        self.canonical = canonical
+        self.categories = tuple(sorted(by_category))
+        self.by_category = by_category
+        self.counts = {cat: len(p) for cat, p in self.by_category.items()}
+        self._unions = {}
+        self._union_sets = {}
+        self._id_bits = {}
+        self._lock = threading.Lock()
+        if all_positions is not None:
+            self._unions[frozenset(self.categories)] = all_positions
+        else:
+            self.positions(self.categories)
+
+    @staticmethod
+    def _scan(rights):
+        by_category = {}
+        seen = {}
+        first = {}
+        canonical = array('I')
+        if isinstance(rights, ColumnarRows):
+            # Read the columns directly instead of through a view per row.
+            rows = zip(rights.texts(), map(rights.categories.__getitem__, rights.codes))
+        else:
+            rows = ((r['text'], r['category']) for r in rights)
+        for pos, (text, cat) in enumerate(rows):
+            canonical.append(first.setdefault(text, pos))
+            texts = seen.setdefault(cat, set())
+            if text in texts:
+                continue
+            texts.add(text)
+            by_category.setdefault(cat, []).append(pos)
+        return canonical, {cat: tuple(p) for cat, p in by_category.items()}
+
+    def positions(self, categories):
+        """Catalog positions for ``categories``, in catalog order, texts deduplicated."""
+        key = frozenset(categories)
+        cached = self._unions.get(key)
+        if cached is not None:
+            return cached
+        with self._lock:
+            cached = self._unions.get(key)
+            if cached is None:
+                cached = self._unions[key] = self._union(key)
+        return cached
+
+    def _union(self, key):
+        lists = [self.by_category[c] for c in key if c in self.by_category]
+        if len(lists) == 1:
+            result = lists[0]
+        else:
+            # Repeats are dropped by canonical ID, so no text is decoded.
+            result = []
+            ids = set()
+            for pos in heapq.merge(*lists):
+                right_id = self.canonical[pos]
+                if right_id not in ids:
+                    ids.add(right_id)
+                    result.append(pos)
+            result = tuple(result)
+        return result
+
+    def position_set(self, categories):
+        """``positions(categories)`` as a frozenset, for membership tests."""
+        key = frozenset(categories)
+        cached = self._union_sets.get(key)
+        if cached is None:
+            positions = self.positions(key)
+            with self._lock:
+                cached = self._union_sets.get(key)
+                if cached is None:
+                    cached = self._union_sets[key] = frozenset(positions)
+        return cached
+
+    def id_selection(self, categories):
+        """A new ``Selection`` of the right IDs in ``categories``.
+
+        Each category's bitset is built once; a combination is the OR of
+        those, so bulk actions on a filter cost a few bitwise operations.
+        """
+        bits = 0
+        for cat in categories:
+            cached = self._id_bits.get(cat)
+            if cached is None:
+                with self._lock:
+                    cached = self._id_bits.get(cat)
+                    if cached is None:
+                        ids = Selection(self.canonical[p] for p in self.by_category.get(cat, ()))
+                        cached = self._id_bits[cat] = int.from_bytes(ids.to_bytes(), "little")
+            bits |= cached
+        return Selection.from_bytes(bits.to_bytes((bits.bit_length() + 7) // 8, "little"))
@@ -0,0 +1,196 @@
+"""Packed, memory-mapped catalog files.
+
+``build_catalog`` runs once per catalog version, seed and size; its rows and
+the category index are then written to a binary file under ``data/`` that
+every process (both app variants, batch workers) maps read-only. Opening the
+file reads only the header and category table, so startup time and resident
+memory don't grow with the catalog: a row's text is decoded when it is
+accessed, and the OS shares the mapped pages between processes.
+
+The header's ``digest`` changes whenever the rows do, e.g. after editing
+data/rights.json without bumping ``CATALOG_VERSION``; the app puts it in the
+catalog stamp, so saved selections and share links never map onto other
+rights. A file in an older format is rebuilt on open.
+
+Layout (little-endian, every section starts on a 4-byte boundary)::
+
+    header      magic "RCAT", format, #categories, catalog version, seed, #rows, text bytes,
+                digest (CRC32 of every section after the header)
+    categories  per category: u16 length + UTF-8 name (sorted by name)
+    counts      u32 per category: deduplicated positions in that category
+    codes       u8 per row: index into the category table
+    canonical   u32 per row: first position holding the same text
+    all         u32 positions of every distinct text, in catalog order
+    by_category u32 positions per category, back to back, in table order
+    offsets     u32 per row + 1: start of each text in the text block
+    texts       UTF-8 texts, back to back
+"""
+import argparse
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import zlib
+from array import array
+
+from catalog import CATALOG_SEED, CATALOG_VERSION, Catalog, CatalogIndex, ColumnarRows, build_catalog
+
+FORMAT_VERSION = 2
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+_MAGIC = b"RCAT"
+_HEADER = struct.Struct("<4sHHIIIII")
+
+def _pad(n):
+    return -n % 4
+
+def _u32(values):
+    a = array('I', values)
+    if sys.byteorder != "little":
+        a.byteswap()
+    return a.tobytes()
+
+def catalog_path(version=CATALOG_VERSION, seed=CATALOG_SEED, size=None, data_dir=DATA_DIR):
+    suffix = f"-n{size}" if size is not None else ""
+    return os.path.join(data_dir, f"catalog-v{version}-s{seed}{suffix}.rcat")
+
+def write_catalog_file(path, rights, version=CATALOG_VERSION, seed=CATALOG_SEED):
+    """Pack ``rights`` and their index into ``path``, replacing it atomically.
+
+    A ``Catalog`` (what ``build_catalog`` returns) is already laid out like
+    the file: its offsets and text buffer are written as they are, and only
+    the category codes are renumbered for the sorted name table.
+    """
+    if not isinstance(rights, Catalog):
+        rights = Catalog(rights)
+    index = CatalogIndex(rights)
+    categories = index.categories
+    renumber = bytes(categories.index(c) for c in rights.categories).ljust(256, b"\0")
+    offsets, texts = rights.offsets, rights.buffer
+
+    table = b"".join(struct.pack("<H", len(c.encode("utf-8"))) + c.encode("utf-8") for c in categories)
+    codes = rights.codes.tobytes().translate(renumber)
+    all_positions = index.positions(categories)
+    sections = [
+        table + bytes(_pad(len(table))),
+        _u32(index.counts[c] for c in categories),
+        codes + bytes(_pad(len(codes))),
+        _u32(index.canonical),
+        _u32([len(all_positions)]) + _u32(all_positions),
+        b"".join(_u32(index.by_category[c]) for c in categories),
+        _u32(offsets),
+        texts,
+    ]
+    digest = 0
+    for s in sections:
+        digest = zlib.crc32(s, digest)
+    sections.insert(0, _HEADER.pack(_MAGIC, FORMAT_VERSION, len(categories), version, seed, len(rights),
+                                    offsets[-1], digest))
+
+    # Written next to the target and renamed, so a reader (or another
+    # process building the same file) never sees a partial file.
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for s in sections:
+                f.write(s)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+class CatalogFile(ColumnarRows):
+    """Read-only view of a packed catalog; rows decode on access.
+
+    Indexing returns a ``RightRow`` view, like the ``Catalog`` that
+    ``build_catalog`` returns, so either can stand in for the other.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mm)
+        if len(self._mm) < _HEADER.size:
+            raise ValueError(f"{path} is not a format {FORMAT_VERSION} catalog file")
+        magic, fmt, n_cats, self.version, self.seed, n, text_bytes, self.digest = _HEADER.unpack_from(self._mm)
+        if magic != _MAGIC or fmt != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a format {FORMAT_VERSION} catalog file")
+        if sys.byteorder != "little":
+            raise ValueError("packed catalogs are little-endian; this platform is not")
+        pos = _HEADER.size
+
+        categories = []
+        for _ in range(n_cats):
+            (length,) = struct.unpack_from("<H", self._mm, pos)
+            categories.append(str(self._mm[pos + 2:pos + 2 + length], "utf-8"))
+            pos += 2 + length
+        pos += _pad(pos)
+        self.categories = tuple(categories)
+
+        def take(count, fmt):
+            nonlocal pos
+            size = count * (4 if fmt == 'I' else 1)
+            section = view[pos:pos + size].cast(fmt)
+            pos += size + _pad(size)
+            return section
+
+        counts = take(n_cats, 'I')
+        self.codes = take(n, 'B')
+        self.canonical = take(n, 'I')
+        self.all_positions = take(take(1, 'I')[0], 'I')
+        self.by_category = {}
+        for cat, count in zip(self.categories, counts):
+            self.by_category[cat] = take(count, 'I')
+        self._offsets = take(n + 1, 'I')
+        self._texts = pos
+        self._len = n
+
+    def __len__(self):
+        return self._len
+
+    def text(self, i):
+        start = self._texts
+        return str(self._mm[start + self._offsets[i]:start + self._offsets[i + 1]], "utf-8")
+
+    def catalog_index(self):
+        """A ``CatalogIndex`` over the stored index sections, without a scan."""
+        return CatalogIndex(self, canonical=self.canonical, by_category=self.by_category,
+                            all_positions=self.all_positions)
+
+def open_catalog(version=CATALOG_VERSION, seed=CATALOG_SEED, size=None, data_dir=DATA_DIR, rebuild=False):
+    """Map the catalog file for this version, seed and size, building it first if needed."""
+    path = catalog_path(version, seed, size, data_dir)
+    if not rebuild and os.path.exists(path):
+        try:
+            return CatalogFile(path)
+        except ValueError:
+            pass  # written by an older format; rebuilt below
+    os.makedirs(data_dir, exist_ok=True)
+    write_catalog_file(path, build_catalog(seed=seed, version=version, size=size), version, seed)
+    return CatalogFile(path)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rewrite the packed catalog, e.g. after editing data/rights.json.")
+    parser.add_argument("--size", type=int, default=int(os.environ.get("RIGHTS_CATALOG_SIZE", 0)) or None,
+                        help="pad or cut the catalog to this many rights (default: RIGHTS_CATALOG_SIZE, else none)")
+    args = parser.parse_args(argv)
+    try:
+        old = CatalogFile(catalog_path(size=args.size)).digest
+    except (OSError, ValueError):
+        old = None
+    cf = open_catalog(size=args.size, rebuild=True)
+    print(f"Wrote {cf.path}: {len(cf)} rights in {len(cf.categories)} categories, "
+          f"{os.path.getsize(cf.path) / 1024:.1f} KiB")
+    # A running server keeps the file it mapped (and its indexes) until it
+    # restarts; a new digest also changes the catalog stamp.
+    if old == cf.digest:
+        print("The rights are unchanged.")
+    else:
+        print("Restart running servers to serve it. Saved selections and share links "
+              "made against the previous catalog will no longer open.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
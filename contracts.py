@@ -0,0 +1,220 @@
+"""Contract rendering and caching.
+
+The exporters here don't depend on Streamlit, so both app variants and the
+headless batch renderer share them. They take the rights' texts already in
+contract order and list them as given, and accept an optional ``progress``
+callable that is called with the number of rights laid out so far (see
+exports.py, which uses it to report and to cancel; the HTML writer calls it
+once per batch). Rendered contracts are keyed by a fingerprint of the
+selection rather than by the selection itself, so the same picks always map
+to the same cache entry, no matter the order they were ticked in or which
+session asked for them.
+"""
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from html import escape
+from string import Template
+
+# Bump whenever the HTML or PDF layout changes so stale files aren't served.
+TEMPLATE_VERSION = 3
+
+RECIPIENT = "Arsha"
+SIGNER = "Idiot Scientist"
+
+# Above this many rights the PDF is streamed to a temporary file instead of
+# being rendered into memory (see pdf_stream.py).
+STREAMING_PDF_THRESHOLD = 1000
+
+# --- PDF Generation ---
+def create_pdf(selected_rights, date_str=None, recipient=RECIPIENT, signer=SIGNER, progress=None):
+    # Imported here: pdf_stream imports the contract names from this module.
+    from pdf_stream import write_contract_pdf
+
+    out = io.BytesIO()
+    write_contract_pdf(out, selected_rights, date_str, recipient, signer, progress)
+    return out.getvalue()
+
+# --- HTML Generation (Fallback) ---
+# The page is split once, at import, into the text before the list and the
+# text after it; rendering only fills in the escaped names and date and
+# writes the rights between the two, a batch at a time.
+HTML_TEMPLATE = """
+    <html>
+    <head>
+        <style>
+            body { font-family: 'Helvetica', sans-serif; padding: 40px; color: #333; }
+            h1 { text-align: center; color: #4CAF50; border-bottom: 2px solid #333; padding-bottom: 10px; }
+            .date { text-align: right; font-style: italic; margin: 20px 0; }
+            ul { line-height: 1.6; }
+            .signature-box { margin-top: 50px; display: flex; justify-content: space-between; }
+            .sig { border-top: 1px solid #333; width: 45%; padding-top: 5px; }
+        </style>
+    </head>
+    <body onload="window.print()">
+        <h1>Official Friendship Contract</h1>
+        <div class="date">Date: $date</div>
+        <p>This document certifies that <strong>$recipient</strong> has been granted the following rights by <strong>$signer</strong> for the 2026 season:</p>
+        <ul>$items</ul>
+        <div class="signature-box">
+            <div class="sig">Signed: $signer</div>
+            <div class="sig">Signed: $recipient</div>
+        </div>
+    </body>
+    </html>
+    """
+HTML_HEAD, HTML_TAIL = (Template(part) for part in HTML_TEMPLATE.split("$items"))
+HTML_BATCH_SIZE = 512
+
+def iter_html(selected_rights, date_str=None, recipient=RECIPIENT, signer=SIGNER, progress=None,
+              batch_size=HTML_BATCH_SIZE):
+    """Yield the HTML contract in chunks: the head, the rights in batches, the tail."""
+    fields = {
+        "date": escape(date_str or datetime.now().strftime("%Y-%m-%d")),
+        "recipient": escape(recipient),
+        "signer": escape(signer),
+    }
+    yield HTML_HEAD.substitute(fields)
+    for start in range(0, len(selected_rights), batch_size):
+        batch = selected_rights[start:start + batch_size]
+        yield "".join(["<li>" + escape(r, quote=False) + "</li>" for r in batch])
+        if progress:
+            progress(start + len(batch))
+    yield HTML_TAIL.substitute(fields)
+
+def write_html(out, selected_rights, date_str=None, recipient=RECIPIENT, signer=SIGNER, progress=None):
+    """Stream the HTML contract to the binary file object ``out`` as UTF-8."""
+    for chunk in iter_html(selected_rights, date_str, recipient, signer, progress):
+        out.write(chunk.encode("utf-8"))
+
+def create_html(selected_rights, date_str=None, recipient=RECIPIENT, signer=SIGNER, progress=None):
+    return "".join(iter_html(selected_rights, date_str, recipient, signer, progress))
+
+def selection_fingerprint(selected_rights, date_str, template_version=TEMPLATE_VERSION):
+    """Return a stable hex digest for a selection on a given contract date.
+
+    Selections reach the exporters already in contract order (catalog order,
+    then custom rights, see selection.py), so hashing them as given is
+    canonical and needs no sort.
+    """
+    h = hashlib.sha256(f"v{template_version}|{date_str}".encode("utf-8"))
+    for right in selected_rights:
+        h.update(b"\0")
+        h.update(right.encode("utf-8"))
+    return h.hexdigest()
+
+def manifest_fingerprint(manifest):
+    """Hex digest of a selection's ``(right ID, category)`` pairs.
+
+    The same texts can carry different IDs (a custom right that repeats a
+    catalog one), so a contract that lists them needs this in its key too.
+    """
+    h = hashlib.sha256()
+    for right_id, category in manifest or ():
+        h.update(f"{right_id}\0{category}\0".encode("utf-8"))
+    return h.hexdigest()
+
+class SharedFile:
+    """A rendered contract in a file that the cache and its readers share.
+
+    ``open()`` returns a new reader each time. ``discard()`` is the cache
+    letting go; the file is freed once that has happened and the last
+    reader is closed, so an eviction never cuts off a download in progress.
+    Subclasses provide ``_raw_reader()`` and ``_free()``.
+    """
+
+    def __init__(self):
+        self._readers = 0
+        self._discarded = False
+        self._ref_lock = threading.Lock()
+
+    def open(self):
+        with self._ref_lock:
+            if self._discarded:
+                raise ValueError("contract file was discarded")
+            self._readers += 1
+        try:
+            return _SharedReader(self._raw_reader(), self._release)
+        except BaseException:
+            self._release()
+            raise
+
+    def discard(self):
+        with self._ref_lock:
+            if self._discarded:
+                return
+            self._discarded = True
+            free = not self._readers
+        if free:
+            self._free()
+
+    def _release(self):
+        with self._ref_lock:
+            self._readers -= 1
+            free = self._discarded and not self._readers
+        if free:
+            self._free()
+
+class _SharedReader(io.BufferedReader):
+    def __init__(self, raw, release):
+        super().__init__(raw)
+        self._release_file = release
+
+    def close(self):
+        if not self.closed:
+            try:
+                super().close()
+            finally:
+                self._release_file()
+
+class ContractCache:
+    """A small thread-safe LRU cache for rendered contracts.
+
+    One instance is shared by every session in the process. Values are built
+    outside the lock, so a slow PDF doesn't block lookups for other keys; two
+    sessions racing on the same key may both build it, and the first one
+    stored wins. ``on_evict`` is called with each value that is dropped, so
+    values backed by temporary files can clean up after themselves.
+
+    ``use``, if given, is applied to the value while it is still in the
+    cache and its result returned instead, e.g. to open a reader on a
+    ``SharedFile`` before another thread can evict and discard it.
+    """
+
+    def __init__(self, max_entries=32, on_evict=None):
+        self.max_entries = max_entries
+        self.on_evict = on_evict
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key, build, use=None):
+        use = use or (lambda value: value)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return use(self._entries[key])
+        value = build()
+        evicted = []
+        with self._lock:
+            stored = self._entries.setdefault(key, value)
+            if stored is not value:
+                evicted.append(value)
+            self._entries.move_to_end(key)
+            result = use(stored)
+            while len(self._entries) > self.max_entries:
+                evicted.append(self._entries.popitem(last=False)[1])
+        self._evict(evicted)
+        return result
+
+    def clear(self):
+        with self._lock:
+            evicted = list(self._entries.values())
+            self._entries.clear()
+        self._evict(evicted)
+
+    def _evict(self, values):
+        if self.on_evict:
+            for value in values:
+                self.on_evict(value)
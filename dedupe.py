@@ -0,0 +1,206 @@
+"""Near-duplicate detection for the hand-written rights.
+
+The exact-match checks elsewhere (``CatalogIndex.canonical``) only catch
+identical strings. Here every text is normalized to a set of content words
+(NFKC, casefolded, ``search.tokenize`` words minus ``STOPWORDS``), and texts
+whose sets have a Jaccard similarity of at least ``threshold`` are grouped:
+texts are taken in order, and each one either joins the first kept text it
+is that similar to or is kept itself.
+
+Comparing every pair is quadratic, so candidates come from MinHash
+signatures banded into LSH buckets:
+
+- each distinct word gets ``num_perm`` hash values once; a text's signature
+  is their elementwise minimum, one C-level ``min`` per slot
+- the signature is cut into ``bands``; texts sharing a band share a bucket
+- a text is checked against the kept texts in its buckets with the exact
+  Jaccard similarity; only the first ``BUCKET_CHECKS`` kept texts of a
+  bucket are checked, and a text that is merged never enters a bucket
+
+With the defaults (60 slots, 20 bands of 3) a pair at similarity 0.5 shares
+a bucket with probability 0.93 and a pair at 0.6 with 0.99, while a pair
+at 0.2 does so only 15% of the time. Capping the checks per bucket keeps
+the cost linear when many texts share a common word. Hashes are CRC32 based, so clusters are
+the same in every process. ``build_catalog`` applies this to the rights in
+data/rights.json; the command line writes the report and canonical catalog:
+
+    python dedupe.py --report dedupe_report.json --out canonical.json
+    python dedupe.py --size 100000        # time it on a padded catalog
+"""
+import argparse
+import json
+import random
+import sys
+import time
+import unicodedata
+import zlib
+from array import array
+
+from search import tokenize
+
+NEAR_DUPLICATE_THRESHOLD = 0.5
+NUM_PERM = 60
+BANDS = 20
+BUCKET_CHECKS = 4
+
+# Pairs at least this similar that were not merged are listed in the report
+# for a human to look at.
+REVIEW_THRESHOLD = 0.3
+
+STOPWORDS = frozenset("""
+    a an and are as at be by for from i if in is it ll m me my of on or our re
+    right s t that the this to us we with you your
+""".split())
+
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+def normalize(text):
+    """The set of content words that ``text`` is compared by."""
+    return frozenset(w for w in tokenize(unicodedata.normalize("NFKC", text)) if w not in STOPWORDS)
+
+def jaccard(a, b):
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+class NearDuplicates:
+    """Clusters of near-duplicate texts, by position in ``texts``.
+
+    ``representative[pos]`` is the kept text that ``pos`` was merged into,
+    always an earlier one, or ``pos`` itself if it is kept. ``similarity``
+    maps each merged position to its similarity with that text, and
+    ``near_misses`` lists ``(similarity, a, b)`` for kept pairs between
+    ``review_threshold`` and ``threshold``, most similar first.
+    """
+
+    def __init__(self, texts, threshold=NEAR_DUPLICATE_THRESHOLD, num_perm=NUM_PERM, bands=BANDS,
+                 review_threshold=REVIEW_THRESHOLD):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.threshold = threshold
+        words = [normalize(t) for t in texts]
+        self.representative = array('I', range(len(words)))
+        self.similarity = {}
+        misses = []
+        buckets = [{} for _ in range(bands)]
+        for pos, keys in self._band_keys(words, num_perm, num_perm // bands):
+            checked = set()
+            for bucket, key in zip(buckets, keys):
+                for other in bucket.get(key, ()):
+                    if other in checked:
+                        continue
+                    checked.add(other)
+                    sim = jaccard(words[other], words[pos])
+                    if sim >= threshold:
+                        self.representative[pos] = other
+                        self.similarity[pos] = sim
+                        break
+                    if sim >= review_threshold:
+                        misses.append((sim, other, pos))
+                else:
+                    continue
+                break
+            else:
+                for bucket, key in zip(buckets, keys):
+                    members = bucket.setdefault(key, [])
+                    if len(members) < BUCKET_CHECKS:
+                        members.append(pos)
+        self.near_misses = sorted(
+            (m for m in misses if m[2] not in self.similarity),
+            key=lambda m: (-m[0], m[1], m[2]),
+        )
+
+    @staticmethod
+    def _band_keys(words, num_perm, rows):
+        """Yield ``(position, band keys)`` for every text with content words."""
+        rng = random.Random(num_perm)
+        perms = [(rng.randrange(1, _PRIME), rng.randrange(_PRIME)) for _ in range(num_perm)]
+        word_hashes = {}
+        for pos, ws in enumerate(words):
+            if not ws:
+                continue
+            sigs = []
+            for w in ws:
+                h = word_hashes.get(w)
+                if h is None:
+                    x = zlib.crc32(w.encode("utf-8"))
+                    h = word_hashes[w] = [((a * x + b) % _PRIME) & _MAX_HASH for a, b in perms]
+                sigs.append(h)
+            signature = list(map(min, *sigs)) if len(sigs) > 1 else sigs[0]
+            yield pos, list(zip(*[iter(signature)] * rows))
+
+    @property
+    def kept(self):
+        """Positions of the texts that stay, in order."""
+        return [pos for pos, rep in enumerate(self.representative) if rep == pos]
+
+    def report(self, rights):
+        """A JSON-ready summary of the clusters found in ``rights``."""
+        def row(pos):
+            return {"position": pos, "category": rights[pos]["category"], "text": rights[pos]["text"]}
+
+        clusters = {}
+        for pos, rep in enumerate(self.representative):
+            if rep != pos:
+                clusters.setdefault(rep, []).append(dict(row(pos), similarity=round(self.similarity[pos], 3)))
+        return {
+            "threshold": self.threshold,
+            "rights": len(rights),
+            "kept": len(rights) - len(self.similarity),
+            "clusters": [{"kept": row(rep), "merged": merged} for rep, merged in sorted(clusters.items())],
+            "near_misses": [
+                {"similarity": round(sim, 3), "a": row(a), "b": row(b)} for sim, a, b in self.near_misses
+            ],
+        }
+
+def canonical_rights(rights, threshold=NEAR_DUPLICATE_THRESHOLD):
+    """``rights`` without the texts that near-duplicate an earlier one."""
+    clusters = NearDuplicates([r["text"] for r in rights], threshold)
+    return [rights[pos] for pos in clusters.kept]
+
+def main():
+    # Imported here: catalog.py imports this module for canonical_rights.
+    from catalog import CATALOG_SEED, CATALOG_VERSION, build_catalog, hand_written_rights
+
+    parser = argparse.ArgumentParser(description="Find near-duplicate rights and write the canonical catalog.")
+    parser.add_argument("--threshold", type=float, default=NEAR_DUPLICATE_THRESHOLD,
+                        help=f"Jaccard similarity that merges two rights (default: {NEAR_DUPLICATE_THRESHOLD})")
+    parser.add_argument("--size", type=int,
+                        help="check the whole catalog padded to this many rights, not just data/rights.json")
+    parser.add_argument("--report", help="write the clusters and near misses as JSON")
+    parser.add_argument("--out", help="write the rights that are kept as JSON")
+    args = parser.parse_args()
+
+    if args.size is None:
+        rights = hand_written_rights()
+    else:
+        rights = list(build_catalog(CATALOG_SEED, CATALOG_VERSION, args.size, dedupe=False))
+    t0 = time.perf_counter()
+    clusters = NearDuplicates([r["text"] for r in rights], args.threshold)
+    elapsed = time.perf_counter() - t0
+    report = clusters.report(rights)
+
+    print(f"{report['rights']} rights, {report['kept']} kept, {len(report['clusters'])} clusters "
+          f"in {elapsed:.2f}s (threshold {args.threshold})")
+    for cluster in report["clusters"][:20]:
+        print(f"  keep  {cluster['kept']['text']}")
+        for m in cluster["merged"]:
+            print(f"  {m['similarity']:.2f}  {m['text']}")
+    if report["near_misses"]:
+        print(f"{len(report['near_misses'])} near misses, e.g.:")
+        for m in report["near_misses"][:5]:
+            print(f"  {m['similarity']:.2f}  {m['a']['text']}  |  {m['b']['text']}")
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Wrote {args.report}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump([rights[pos] for pos in clusters.kept], f, indent=2, ensure_ascii=False)
+        print(f"Wrote {args.out}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
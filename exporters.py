@@ -0,0 +1,111 @@
+"""Contract formats, registered by name and imported on first use.
+
+Each ``Exporter`` names the function that renders its format as a
+``"module:function"`` string. The module is imported the first time a
+contract in that format is built, so a script that never exports a PDF never
+imports the PDF writer or its font code, and adding a format costs nothing
+at startup. Another module can add a format the same way::
+
+    register(Exporter("md", "📝 Markdown", "📝 Download Markdown", "contract.md",
+                      "text/markdown", "markdown_export:create_markdown"))
+
+Renderers take ``(selected_rights, date_str=None, progress=None, **names)``
+like the ones in contracts.py and return ``bytes``/``str``, or an object
+with ``open()`` (a reader for the download) and ``discard()`` (called when
+the contract cache drops it), like ``pdf_stream.PDFFile``.
+
+A format can also name a ``writer``, which takes a binary file object first
+and streams the contract into it; ``Exporter.write`` uses it when there is
+one, so a contract embedded in another file (see bundle.py) is never held
+in memory whole. A format marked ``manifest=True`` is passed the right IDs
+and categories of the selection as ``manifest``.
+
+A ``composite`` format (the bundle) packs other formats' contracts. It is
+built only when it is downloaded, from the contracts the app has already
+rendered, so claiming never renders a contract twice.
+"""
+import importlib
+import shutil
+
+def _import(target):
+    module, _, name = target.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+class Exporter:
+    """One contract format: how to label and serve it, and what renders it."""
+
+    def __init__(self, kind, label, button_label, file_name, mime, target, writer=None, manifest=False,
+                 composite=False):
+        self.kind = kind
+        self.label = label
+        self.button_label = button_label
+        self.file_name = file_name
+        self.mime = mime
+        self.target = target
+        self.writer = writer
+        self.manifest = manifest
+        self.composite = composite
+        self._render = None
+
+    @property
+    def loaded(self):
+        return self._render is not None
+
+    def load(self):
+        """Import the renderer, once."""
+        if self._render is None:
+            self._render = _import(self.target)
+        return self._render
+
+    def __call__(self, selected_rights, date_str=None, progress=None, **names):
+        return self.load()(selected_rights, date_str, progress=progress, **names)
+
+    def write(self, out, selected_rights, date_str=None, progress=None, **names):
+        """Write the contract into the binary file object ``out``."""
+        if self.writer:
+            _import(self.writer)(out, selected_rights, date_str, progress=progress, **names)
+            return
+        data = self(selected_rights, date_str, progress=progress, **names)
+        try:
+            copy_contract(data, out)
+        finally:
+            discard = getattr(data, "discard", None)
+            if discard:
+                discard()
+
+    def __repr__(self):
+        return f"Exporter({self.kind!r}, {self.target!r}, loaded={self.loaded})"
+
+def copy_contract(data, out):
+    """Write a rendered contract into ``out``.
+
+    ``data`` is ``str``, ``bytes``, a file-backed contract or a reader
+    already opened on one, which is closed afterwards.
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    if isinstance(data, bytes):
+        out.write(data)
+        return
+    with (data if hasattr(data, "read") else data.open()) as f:
+        shutil.copyfileobj(f, out)
+
+EXPORTERS = {}
+
+def register(exporter):
+    """Add ``exporter`` to the registry, replacing any format of the same kind."""
+    EXPORTERS[exporter.kind] = exporter
+    return exporter
+
+def get_exporter(kind):
+    try:
+        return EXPORTERS[kind]
+    except KeyError:
+        raise ValueError(f"unknown contract format {kind!r}; registered: {', '.join(EXPORTERS)}") from None
+
+register(Exporter("pdf", "📄 PDF", "📄 Download PDF Contract", "Friendship_Contract_2026.pdf",
+                  "application/pdf", "pdf_stream:create_contract_pdf", writer="pdf_stream:write_contract_pdf"))
+register(Exporter("html", "🌐 HTML", "🌐 Download HTML (Print Friendly)", "Friendship_Contract_2026.html",
+                  "text/html", "contracts:create_html", writer="contracts:write_html"))
+register(Exporter("bundle", "🗂️ Bundle", "🗂️ Download Everything (ZIP)", "Friendship_Contract_2026.zip",
+                  "application/zip", "bundle:create_bundle", manifest=True, composite=True))
@@ -0,0 +1,85 @@
+"""Background contract rendering.
+
+Claiming a selection submits one export job per format to a small pool
+shared by every session, so a large contract never blocks a script run. A
+job follows its exporter through the ``progress`` hook the exporters in
+contracts.py and pdf_stream.py accept, and that hook is also where
+cancellation lands: after ``cancel()`` the next progress call raises
+``Cancelled``, so a job for a selection that has since changed stops within
+one right.
+
+The pool uses threads rather than processes: finished contracts go into the
+process-wide contract cache and are served from there, and the rights lists
+never have to be pickled. A job keeps only its status, never the contract.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+class Cancelled(Exception):
+    """Raised inside a job's exporter once the job has been cancelled."""
+
+class ExportJob:
+    """One contract being rendered; polled by the UI for ``done``/``state``."""
+
+    def __init__(self, kind, total):
+        self.kind = kind
+        self.total = total
+        self.done = 0
+        self.state = "queued"
+        self.error = None
+        self._cancelled = threading.Event()
+        self._future = None
+
+    def progress(self, done):
+        if self._cancelled.is_set():
+            raise Cancelled()
+        self.done = done
+
+    @property
+    def fraction(self):
+        return min(1.0, self.done / self.total) if self.total else 1.0
+
+    @property
+    def finished(self):
+        return self.state in ("done", "failed", "cancelled")
+
+    def cancel(self):
+        """Stop the job; a finished job is left as it is."""
+        self._cancelled.set()
+        if self._future is not None and self._future.cancel():
+            self.state = "cancelled"
+
+    def _run(self, build):
+        if self._cancelled.is_set():
+            self.state = "cancelled"
+            return
+        self.state = "running"
+        try:
+            # The contract lands in the shared contract cache; the job
+            # doesn't hold on to it, so a session's finished jobs stay small.
+            build(self.progress)
+            self.done = self.total
+            self.state = "done"
+        except Cancelled:
+            self.state = "cancelled"
+        except Exception as e:
+            self.error = e
+            self.state = "failed"
+
+class ExportPool:
+    """A bounded pool of export workers.
+
+    ``build`` is called on a worker thread with the job's progress callable
+    and should pass it on to the exporter.
+    """
+
+    def __init__(self, max_workers=2):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="export")
+
+    def submit(self, kind, total, build):
+        job = ExportJob(kind, total)
+        job._future = self._executor.submit(job._run, build)
+        return job
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
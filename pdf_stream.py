@@ -0,0 +1,435 @@
+"""PDF export, streamed page by page.
+
+``StreamingPDF`` follows FPDF's page model and drawing calls (millimetres,
+top-left origin) but writes each page to the output file as soon as it is
+full, so only the current page and the cross-reference offsets are ever held
+in memory. ``create_pdf`` renders into a memory buffer with the same writer;
+large contracts go straight to a temporary file (``create_pdf_file``).
+
+Text is set in the bundled DejaVu Sans (see ttfont.py) rather than a core
+PDF font, so any character the font covers prints as typed. Glyphs are
+addressed by ID (Identity-H), and at the end of the document each font is
+embedded as a subset holding only the glyphs the document used, along with
+a ToUnicode map so the text can still be copied and searched. DejaVu has no
+oblique face in the bundle; italic text is slanted through the text matrix.
+"""
+import hashlib
+import io
+import os
+import tempfile
+import zlib
+from array import array
+from datetime import datetime
+
+from contracts import RECIPIENT, SIGNER, STREAMING_PDF_THRESHOLD, SharedFile, create_pdf
+from ttfont import load_font
+
+K = 72 / 25.4  # points per millimetre
+PAGE_W, PAGE_H = 210.0, 297.0  # A4
+MARGIN = 10.0
+CELL_MARGIN = MARGIN / 10
+
+# Object numbers reserved up front; page objects are numbered after them.
+# Each font takes five: Type0 font, CID font, descriptor, font file, ToUnicode.
+CATALOG_OBJ, PAGES_OBJ = 1, 2
+FONTS = {
+    'F1': (3, 'DejaVuSans'),
+    'F2': (8, 'DejaVuSans-Bold'),
+}
+FIRST_PAGE_OBJ = 13
+
+# Style -> (font resource, horizontal shear of the text matrix).
+OBLIQUE = 0.2126  # tan(12 degrees)
+STYLES = {
+    '': ('F1', 0),
+    'B': ('F2', 0),
+    'I': ('F1', OBLIQUE),
+}
+
+def _subset_tag(gids):
+    """Six capital letters naming a subset, derived from the glyphs it holds."""
+    digest = hashlib.md5(b''.join(g.to_bytes(2, 'big') for g in sorted(gids))).hexdigest()
+    return ''.join(chr(ord('A') + int(c, 16)) for c in digest[:6])
+
+def _escape(s):
+    return s.replace('\\', '\\\\').replace(')', '\\)').replace('(', '\\(').replace('\r', '\\r')
+
+def _utf16_hex(char):
+    return char.encode('utf-16-be').hex().upper()
+
+class _GlyphCodes(dict):
+    """A ``str.translate`` table from characters to escaped two-byte glyph IDs.
+
+    Filled in on first use, which is also where the glyphs a document uses
+    are recorded (``used``: glyph ID -> the character it shows).
+    """
+
+    def __init__(self, font):
+        super().__init__()
+        self.font = font
+        self.used = {0: '\ufffd'}
+
+    def __missing__(self, code_point):
+        char = chr(code_point)
+        gid = self.font.glyph_id(char)
+        self.used.setdefault(gid, char)
+        code = self[code_point] = _escape(chr(gid >> 8) + chr(gid & 0xFF))
+        return code
+
+class StreamingPDF:
+    """A write-once PDF that flushes each finished page to ``out``.
+
+    ``out`` is any binary file object; nothing is ever read back from it.
+    """
+
+    def __init__(self, out, bottom_margin=15):
+        self.out = out
+        self.pos = 0
+        self.offsets = array('Q', [0] * FIRST_PAGE_OBJ)
+        self.page_objs = array('L')
+        self.page = None
+        self.page_break_trigger = PAGE_H - bottom_margin
+        self.x, self.y = MARGIN, MARGIN
+        self.ws = 0
+        self.style, self.font_size_pt = '', 12
+        self.text_color = '0 g'
+        self.draw_color = '0 G'
+        self.fonts = {tag: load_font(name) for tag, (_, name) in FONTS.items()}
+        self.codes = {tag: _GlyphCodes(font) for tag, font in self.fonts.items()}
+        self._write(b'%PDF-1.3\n')
+
+    # --- Low level output ---
+    def _write(self, data):
+        self.out.write(data)
+        self.pos += len(data)
+
+    def _begin_obj(self, num):
+        if num >= len(self.offsets):
+            self.offsets.extend([0] * (num + 1 - len(self.offsets)))
+        self.offsets[num] = self.pos
+        self._write(b'%d 0 obj\n' % num)
+
+    def _stream_obj(self, num, data, extra=b''):
+        data = zlib.compress(data)
+        self._begin_obj(num)
+        self._write(b'<</Filter /FlateDecode /Length %d%s>>\nstream\n' % (len(data), extra))
+        self._write(data)
+        self._write(b'\nendstream\nendobj\n')
+
+    def _out(self, s):
+        self.page.append(s)
+
+    @property
+    def font_size(self):
+        return self.font_size_pt / K
+
+    @property
+    def font(self):
+        return self.fonts[STYLES[self.style][0]]
+
+    # --- Pages ---
+    def add_page(self):
+        if self.page is not None:
+            self._flush_page()
+        self.page = []
+        self.x, self.y = MARGIN, MARGIN
+        self._out('0.57 w')
+        self._out(self.draw_color)
+        self._select_font()
+
+    def _flush_page(self):
+        content_obj = FIRST_PAGE_OBJ + 2 * len(self.page_objs)
+        self._stream_obj(content_obj, '\n'.join(self.page).encode('latin-1'))
+        self._begin_obj(content_obj + 1)
+        self._write(
+            b'<</Type /Page /Parent %d 0 R /MediaBox [0 0 %.2f %.2f] '
+            b'/Resources <</Font <<%s>>>> /Contents %d 0 R>>\nendobj\n' % (
+                PAGES_OBJ, PAGE_W * K, PAGE_H * K,
+                b' '.join(b'/%s %d 0 R' % (tag.encode(), num) for tag, (num, _) in FONTS.items()),
+                content_obj,
+            )
+        )
+        self.page_objs.append(content_obj + 1)
+        self.page = None
+
+    # --- Drawing state ---
+    def set_font(self, style='', size=12):
+        self.style, self.font_size_pt = style, size
+        if self.page is not None:
+            self._select_font()
+
+    def _select_font(self):
+        self._out('BT /%s %.2f Tf ET' % (STYLES[self.style][0], self.font_size_pt))
+
+    def set_text_color(self, r, g, b):
+        self.text_color = '%.3f %.3f %.3f rg' % (r / 255, g / 255, b / 255)
+
+    def set_draw_color(self, r, g, b):
+        self.draw_color = '%.3f %.3f %.3f RG' % (r / 255, g / 255, b / 255)
+        if self.page is not None:
+            self._out(self.draw_color)
+
+    def get_string_width(self, s):
+        cw = self.font.char_widths(s)
+        return sum(cw[c] for c in s) * self.font_size / 1000
+
+    def get_y(self):
+        return self.y
+
+    def set_y(self, y):
+        self.x = MARGIN
+        self.y = y if y >= 0 else PAGE_H + y
+
+    def ln(self, h):
+        self.x = MARGIN
+        self.y += h
+
+    # --- Text and lines ---
+    def _show(self, x, y, txt):
+        """Text-showing operators for ``txt`` with its baseline starting at (x, y) mm.
+
+        The word spacing ``Tw`` operator only applies to single-byte codes, so
+        justified lines space their words out with ``TJ`` adjustments instead.
+        """
+        if self.ws > 0 and ' ' in txt:
+            codes = self.codes[STYLES[self.style][0]]
+            gap = '%s) %.3f (' % (codes[32], -self.ws * K * 1000 / self.font_size_pt)
+            show = '[(%s)] TJ' % gap.join([w.translate(codes) for w in txt.split(' ')])
+        else:
+            show = '(%s) Tj' % txt.translate(self.codes[STYLES[self.style][0]])
+        slant = STYLES[self.style][1]
+        if slant:
+            move = '1 0 %.4f 1 %.2f %.2f Tm' % (slant, x * K, (PAGE_H - y) * K)
+        else:
+            move = '%.2f %.2f Td' % (x * K, (PAGE_H - y) * K)
+        return 'q %s BT %s %s ET Q' % (self.text_color, move, show)
+
+    def cell(self, w, h, txt='', ln=0, align=''):
+        if self.y + h > self.page_break_trigger:
+            x = self.x
+            self.add_page()
+            self.x = x
+        if w == 0:
+            w = PAGE_W - MARGIN - self.x
+        if txt:
+            if align == 'R':
+                dx = w - CELL_MARGIN - self.get_string_width(txt)
+            elif align == 'C':
+                dx = (w - self.get_string_width(txt)) / 2
+            else:
+                dx = CELL_MARGIN
+            self._out(self._show(self.x + dx, self.y + .5 * h + .3 * self.font_size, txt))
+        if ln > 0:
+            self.y += h
+            if ln == 1:
+                self.x = MARGIN
+        else:
+            self.x += w
+
+    def multi_cell(self, w, h, txt, align='J'):
+        """Word-wrapped, justified paragraph; same line breaking as FPDF."""
+        if w == 0:
+            w = PAGE_W - MARGIN - self.x
+        wmax = (w - 2 * CELL_MARGIN) * 1000 / self.font_size
+        s = txt.replace('\r', '')
+        cw = self.font.char_widths(s)
+        sep, i, j, l, ns, ls = -1, 0, 0, 0, 0, 0
+        while i < len(s):
+            c = s[i]
+            if c == '\n':
+                self.ws = 0
+                self.cell(w, h, s[j:i], 2, align)
+                i += 1
+                sep, j, l, ns = -1, i, 0, 0
+                continue
+            if c == ' ':
+                sep, ls = i, l
+                ns += 1
+            l += cw[c]
+            if l > wmax:
+                if sep == -1:
+                    if i == j:
+                        i += 1
+                    self.ws = 0
+                    self.cell(w, h, s[j:i], 2, align)
+                else:
+                    if align == 'J':
+                        self.ws = (wmax - ls) / 1000 * self.font_size / (ns - 1) if ns > 1 else 0
+                    self.cell(w, h, s[j:sep], 2, align)
+                    i = sep + 1
+                sep, j, l, ns = -1, i, 0, 0
+            else:
+                i += 1
+        self.ws = 0
+        self.cell(w, h, s[j:i], 2, align)
+        self.x = MARGIN
+
+    def text(self, x, y, txt):
+        self._out(self._show(x, y, txt))
+
+    def line(self, x1, y1, x2, y2):
+        self._out('%.2f %.2f m %.2f %.2f l S' % (x1 * K, (PAGE_H - y1) * K, x2 * K, (PAGE_H - y2) * K))
+
+    # --- Fonts ---
+    def _write_font(self, tag):
+        """Embed the subset of font ``tag`` covering the glyphs this document used."""
+        num, _ = FONTS[tag]
+        font, used = self.fonts[tag], self.codes[tag].used
+        gids = sorted(used)
+        name = b'%s+%s' % (_subset_tag(gids).encode(), font.name.encode())
+        scale = 1000 / font.units_per_em
+
+        self._begin_obj(num)
+        self._write(b'<</Type /Font /Subtype /Type0 /BaseFont /%s /Encoding /Identity-H '
+                    b'/DescendantFonts [%d 0 R] /ToUnicode %d 0 R>>\nendobj\n' % (name, num + 1, num + 4))
+
+        # Widths, one array per run of consecutive glyph IDs.
+        runs = []
+        for gid in gids:
+            if runs and runs[-1][0] + len(runs[-1][1]) == gid:
+                runs[-1][1].append(font.widths[gid])
+            else:
+                runs.append((gid, [font.widths[gid]]))
+        widths = b' '.join(b'%d [%s]' % (start, b' '.join(b'%d' % w for w in ws)) for start, ws in runs)
+        self._begin_obj(num + 1)
+        self._write(b'<</Type /Font /Subtype /CIDFontType2 /BaseFont /%s '
+                    b'/CIDSystemInfo <</Registry (Adobe) /Ordering (Identity) /Supplement 0>> '
+                    b'/FontDescriptor %d 0 R /CIDToGIDMap /Identity /W [%s]>>\nendobj\n'
+                    % (name, num + 2, widths))
+
+        self._begin_obj(num + 2)
+        self._write(b'<</Type /FontDescriptor /FontName /%s /Flags 32 /FontBBox [%s] /ItalicAngle %d '
+                    b'/Ascent %d /Descent %d /CapHeight %d /StemV %d /FontFile2 %d 0 R>>\nendobj\n' % (
+                        name, b' '.join(b'%d' % round(v * scale) for v in font.bbox), font.italic_angle,
+                        round(font.ascent * scale), round(font.descent * scale),
+                        round(font.cap_height * scale), 50 + (font.weight / 65) ** 2, num + 3))
+
+        program = font.subset(frozenset(gids))
+        self._stream_obj(num + 3, program, b' /Length1 %d' % len(program))
+
+        cmap = [
+            '/CIDInit /ProcSet findresource begin', '12 dict begin', 'begincmap',
+            '/CIDSystemInfo <</Registry (Adobe) /Ordering (UCS) /Supplement 0>> def',
+            '/CMapName /Adobe-Identity-UCS def', '/CMapType 2 def',
+            '1 begincodespacerange', '<0000> <FFFF>', 'endcodespacerange',
+        ]
+        for i in range(0, len(gids), 100):
+            chunk = gids[i:i + 100]
+            cmap.append('%d beginbfchar' % len(chunk))
+            cmap.extend('<%04X> <%s>' % (gid, _utf16_hex(used[gid])) for gid in chunk)
+            cmap.append('endbfchar')
+        cmap += ['endcmap', 'CMapName currentdict /CMap defineresource pop', 'end', 'end']
+        self._stream_obj(num + 4, '\n'.join(cmap).encode('ascii'))
+
+    # --- Trailer ---
+    def close(self):
+        """Flush the last page, embed the font subsets and write the trailer."""
+        if self.page is not None:
+            self._flush_page()
+        for tag in FONTS:
+            self._write_font(tag)
+        self._begin_obj(PAGES_OBJ)
+        self._write(b'<</Type /Pages /Count %d /Kids [' % len(self.page_objs))
+        for num in self.page_objs:
+            self._write(b'%d 0 R ' % num)
+        self._write(b']>>\nendobj\n')
+        self._begin_obj(CATALOG_OBJ)
+        self._write(b'<</Type /Catalog /Pages %d 0 R>>\nendobj\n' % PAGES_OBJ)
+        xref = self.pos
+        self._write(b'xref\n0 %d\n0000000000 65535 f \n' % len(self.offsets))
+        for off in self.offsets[1:]:
+            self._write(b'%010d 00000 n \n' % off)
+        self._write(b'trailer\n<</Size %d /Root %d 0 R>>\nstartxref\n%d\n%%%%EOF\n'
+                    % (len(self.offsets), CATALOG_OBJ, xref))
+
+def write_contract_pdf(out, selected_rights, date_str=None, recipient=RECIPIENT, signer=SIGNER, progress=None):
+    """Lay out the contract exactly like ``create_pdf``, streaming it to ``out``."""
+    pdf = StreamingPDF(out)
+    pdf.add_page()
+
+    # Title
+    pdf.set_font('B', 24)
+    pdf.set_text_color(76, 175, 80) # Green
+    pdf.cell(0, 20, "Official Friendship Contract", ln=1, align='C')
+
+    # Metadata
+    pdf.set_text_color(0, 0, 0)
+    pdf.set_font('I', 12)
+    date_str = date_str or datetime.now().strftime("%Y-%m-%d")
+    pdf.cell(0, 10, f"Date: {date_str}", ln=1, align='R')
+
+    # Intro
+    pdf.set_font('', 12)
+    intro = f"This document certifies that {recipient} has been granted the following rights by {signer} for the 2026 season:"
+    pdf.multi_cell(0, 8, intro)
+    pdf.ln(5)
+
+    # Rights List
+    pdf.set_font('', 11)
+    for i, right in enumerate(selected_rights):
+        pdf.multi_cell(0, 7, f"{i+1}. {right}")
+        if progress:
+            progress(i + 1)
+
+    pdf.ln(15)
+
+    # Signature Block
+    y = pdf.get_y()
+    if y > 240:
+        pdf.add_page()
+        y = 20
+
+    pdf.set_draw_color(0, 0, 0)
+    pdf.line(20, y+10, 80, y+10)
+    pdf.text(20, y+15, f"Signed: {signer}")
+
+    pdf.line(110, y+10, 170, y+10)
+    pdf.text(110, y+15, f"Signed: {recipient}")
+
+    # Footer
+    pdf.set_y(-20)
+    pdf.set_font('I', 8)
+    pdf.set_text_color(150, 150, 150)
+    pdf.cell(0, 10, "Contract ID: FRIEND-2026-SECURE | Valid in all dimensions.", ln=1, align='C')
+
+    pdf.close()
+
+class PDFFile(SharedFile):
+    """A finished PDF on disk.
+
+    Each ``open()`` returns a fresh reader, so one cached file can back any
+    number of downloads; the file is removed once it has left the cache and
+    its last reader is closed (see ``SharedFile``).
+    """
+
+    def __init__(self, path, size):
+        super().__init__()
+        self.path = path
+        self.size = size
+
+    def _raw_reader(self):
+        return io.FileIO(self.path, "r")
+
+    def _free(self):
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+def create_pdf_file(selected_rights, date_str=None, **names):
+    """Stream the contract PDF into a temporary file and return it as a ``PDFFile``."""
+    with tempfile.NamedTemporaryFile(prefix="contract_", suffix=".pdf", delete=False) as out:
+        try:
+            write_contract_pdf(out, selected_rights, date_str, **names)
+        except BaseException:
+            # Failed or cancelled (see exports.py): don't leave a partial file.
+            out.close()
+            os.unlink(out.name)
+            raise
+        return PDFFile(out.name, out.tell())
+
+def create_contract_pdf(selected_rights, date_str=None, **names):
+    """The contract as PDF bytes, or as a ``PDFFile`` above ``STREAMING_PDF_THRESHOLD`` rights."""
+    if len(selected_rights) > STREAMING_PDF_THRESHOLD:
+        return create_pdf_file(selected_rights, date_str, **names)
+    return create_pdf(selected_rights, date_str, **names)
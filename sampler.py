@@ -0,0 +1,93 @@
+"""Weighted random draws from the catalog ("Surprise me").
+
+A draw picks ``k`` distinct rights, each one by first choosing a category in
+proportion to its weight and then a right of that category uniformly, so
+weights of Romance 3, Foodie 1 make about three in four of the drawn rights
+Romance whatever the categories' sizes. Neither step looks at the whole
+catalog:
+
+- the category comes from an alias table (Vose's method): two random
+  numbers and two list lookups per pick, after an O(#categories) build
+- the right comes from a lazy Fisher-Yates shuffle of the category's
+  positions in ``CatalogIndex.by_category``: each pick swaps one slot, and
+  only the swapped slots are stored, so nothing is copied or shuffled up
+  front and no position is picked twice
+
+A category that runs out is dropped and the table rebuilt for the rest.
+Rights already selected (``exclude``) and texts listed under two
+categories are skipped when they come up, so a draw costs O(k) plus the
+skipped picks. The same seed, weights, catalog and ``exclude`` always give
+the same draw.
+"""
+import random
+
+class AliasTable:
+    """O(1) sampling of an index with probability proportional to ``weights``."""
+
+    def __init__(self, weights):
+        n = len(weights)
+        total = sum(weights)
+        if not n or total <= 0:
+            raise ValueError("weights must include a positive value")
+        scaled = [w * n / total for w in weights]
+        self.prob = [1.0] * n
+        self.alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1]
+        large = [i for i, p in enumerate(scaled) if p >= 1]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] -= 1 - scaled[s]
+            (small if scaled[l] < 1 else large).append(l)
+
+    def sample(self, rng):
+        i = rng.randrange(len(self.prob))
+        return i if rng.random() < self.prob[i] else self.alias[i]
+
+class _Pool:
+    """The positions of one category, handed out in random order without repeats."""
+
+    __slots__ = ("positions", "left", "moved")
+
+    def __init__(self, positions):
+        self.positions = positions
+        self.left = len(positions)
+        self.moved = {}
+
+    def take(self, rng):
+        # Swap a random slot of the untaken prefix with its last slot,
+        # recording only the slots that no longer hold their own position.
+        i = rng.randrange(self.left)
+        self.left -= 1
+        moved, last = self.moved, self.left
+        pos = self.positions[moved.get(i, i)]
+        moved[i] = moved.get(last, last)
+        return pos
+
+def draw_rights(index, weights, k, seed=None, exclude=None):
+    """Up to ``k`` random right IDs from ``index``, in the order drawn.
+
+    ``weights`` maps category names to their share of the draw; categories
+    left out or weighted 0 are never drawn from. IDs in ``exclude`` (e.g.
+    the current ``Selection``) are skipped. Fewer than ``k`` come back only
+    when the weighted categories have no other rights left.
+    """
+    rng = random.Random(seed)
+    categories = [c for c in index.categories if weights.get(c, 0) > 0 and index.counts[c]]
+    pools = {c: _Pool(index.by_category[c]) for c in categories}
+    drawn, seen = [], set()
+    table = AliasTable([weights[c] for c in categories]) if categories else None
+    while len(drawn) < k and categories:
+        cat = categories[table.sample(rng)]
+        pool = pools[cat]
+        right_id = index.canonical[pool.take(rng)]
+        if not pool.left:
+            categories.remove(cat)
+            if categories:
+                table = AliasTable([weights[c] for c in categories])
+        if right_id in seen or (exclude is not None and right_id in exclude):
+            continue
+        seen.add(right_id)
+        drawn.append(right_id)
+    return drawn
@@ -0,0 +1,136 @@
+"""Full-text search over the rights catalog.
+
+``SearchIndex`` is an inverted index from word tokens to the positions of
+the texts that contain them. Each query word matches the words it is a
+prefix of; if none match, words within a small edit distance are used
+instead, found through a trigram index over the vocabulary. Results are
+catalog positions in catalog order, the same ids ``CatalogIndex`` uses.
+"""
+import re
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+
+TOKEN_RE = re.compile(r"\w+")
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.casefold())
+
+def trigrams(word):
+    padded = f"${word}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def max_typos(word):
+    """How many edits a query word may be away from a catalog word."""
+    if len(word) < 4:
+        return 0
+    return 1 if len(word) < 8 else 2
+
+def within_distance(a, b, limit):
+    """True when ``a`` and ``b`` are at most ``limit`` edits apart.
+
+    Edits are insertions, deletions, substitutions and swaps of two
+    adjacent letters (optimal string alignment distance), so "karoake"
+    is one edit from "karaoke".
+    """
+    if abs(len(a) - len(b)) > limit:
+        return False
+    prev2, prev = None, list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            d = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb))
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                d = min(d, prev2[j - 2] + 1)
+            cur.append(d)
+        if min(cur) > limit:
+            return False
+        prev2, prev = prev, cur
+    return prev[-1] <= limit
+
+class SearchIndex:
+    """Token and trigram inverted index over a sequence of texts.
+
+    Built once per catalog and then only read, so it can be shared between
+    sessions. Resolved query words and whole queries are memoized in a
+    small LRU, so a query seen before (by any session) costs one lookup, and
+    a new one only pays for the words that changed.
+    """
+
+    def __init__(self, texts, cache_size=256):
+        postings = {}
+        for pos, text in enumerate(texts):
+            for tok in set(tokenize(text)):
+                postings.setdefault(tok, []).append(pos)
+        self.vocab = sorted(postings)
+        self.postings = {tok: tuple(p) for tok, p in postings.items()}
+        grams = {}
+        for tok in self.vocab:
+            for g in trigrams(tok):
+                grams.setdefault(g, []).append(tok)
+        self.trigrams = {g: tuple(toks) for g, toks in grams.items()}
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+
+    def expand(self, word):
+        """Catalog words a query word stands for: prefix matches, else near misses."""
+        matches = []
+        i = bisect_left(self.vocab, word)
+        while i < len(self.vocab) and self.vocab[i].startswith(word):
+            matches.append(self.vocab[i])
+            i += 1
+        if matches:
+            return matches
+        limit = max_typos(word)
+        if not limit:
+            return []
+        grams = trigrams(word)
+        shared = {}
+        for g in grams:
+            for tok in self.trigrams.get(g, ()):
+                shared[tok] = shared.get(tok, 0) + 1
+        # Each edit breaks at most four trigrams (a swap of two letters).
+        needed = max(1, len(grams) - 4 * limit)
+        return [tok for tok, n in shared.items()
+                if n >= needed and within_distance(word, tok, limit)]
+
+    def _cached(self, key, compute):
+        with self._lock:
+            hit = self._cache.get(key)
+            if hit is not None:
+                self._cache.move_to_end(key)
+                return hit
+        value = compute()
+        with self._lock:
+            self._cache[key] = value
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return value
+
+    def _resolve(self, word):
+        def compute():
+            docs = set()
+            for tok in self.expand(word):
+                docs.update(self.postings[tok])
+            return frozenset(docs)
+        return self._cached(("word", word), compute)
+
+    def search(self, query):
+        """Positions of texts matching every word of ``query``, in catalog order.
+
+        Returns None for a blank query, meaning "no search filter".
+        """
+        words = tuple(sorted(set(tokenize(query))))
+        if not words:
+            return None
+
+        def compute():
+            sets = sorted((self._resolve(w) for w in words), key=len)
+            result = set(sets[0])
+            for s in sets[1:]:
+                result.intersection_update(s)
+                if not result:
+                    break
+            return tuple(sorted(result))
+        return self._cached(("query", words), compute)
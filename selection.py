@@ -0,0 +1,239 @@
+"""Bitset-backed selection of right IDs.
+
+Right IDs are small integers: catalog rights use their catalog position
+(``CatalogIndex.canonical`` maps repeated texts to one ID) and a session's
+custom rights are numbered after the catalog. A ``Selection`` stores one bit
+per ID, so a session with tens of thousands of picks costs a few kilobytes,
+membership and counts are O(1), and iteration yields IDs in ascending order,
+which is catalog order, with no sorting.
+"""
+import base64
+import binascii
+import operator
+import struct
+import zlib
+from collections import deque
+
+class Selection:
+    """A mutable set of non-negative integer IDs stored as a bitset."""
+
+    __slots__ = ("_bits", "_count")
+
+    def __init__(self, ids=(), capacity=0):
+        self._bits = bytearray((capacity + 7) // 8)
+        self._count = 0
+        self.update(ids)
+
+    def _grow(self, right_id):
+        need = right_id // 8 + 1
+        if need > len(self._bits):
+            self._bits.extend(bytes(max(need, 2 * len(self._bits)) - len(self._bits)))
+
+    def add(self, right_id):
+        if right_id < 0:
+            raise ValueError(f"right IDs are non-negative, got {right_id}")
+        self._grow(right_id)
+        byte, mask = right_id >> 3, 1 << (right_id & 7)
+        if not self._bits[byte] & mask:
+            self._bits[byte] |= mask
+            self._count += 1
+
+    def discard(self, right_id):
+        byte, mask = right_id >> 3, 1 << (right_id & 7)
+        if 0 <= byte < len(self._bits) and self._bits[byte] & mask:
+            self._bits[byte] &= ~mask
+            self._count -= 1
+
+    # --- Bulk operations ---
+    # With another Selection these are one bitwise operation over the whole
+    # bitset (as Python ints), not a loop over IDs; any other iterable of
+    # IDs is packed into a Selection first.
+    def _int(self):
+        return int.from_bytes(self._bits, "little")
+
+    def _set_int(self, bits):
+        size = max(len(self._bits), (bits.bit_length() + 7) // 8)
+        self._bits = bytearray(bits.to_bytes(size, "little"))
+        self._count = bits.bit_count()
+
+    def _combine(self, other, op):
+        if not isinstance(other, Selection):
+            other = Selection(other)
+        self._set_int(op(self._int(), other._int()))
+
+    def update(self, ids):
+        """Add ``ids``."""
+        if isinstance(ids, Selection):
+            self._combine(ids, operator.or_)
+        else:
+            for right_id in ids:
+                self.add(right_id)
+
+    def difference_update(self, ids):
+        """Remove ``ids``."""
+        self._combine(ids, lambda a, b: a & ~b)
+
+    def symmetric_difference_update(self, ids):
+        """Flip ``ids``: add the ones not selected, remove the ones that are."""
+        self._combine(ids, operator.xor)
+
+    def clear(self):
+        self._bits = bytearray(len(self._bits))
+        self._count = 0
+
+    def copy(self):
+        other = Selection()
+        other._bits = bytearray(self._bits)
+        other._count = self._count
+        return other
+
+    def __contains__(self, right_id):
+        byte = right_id >> 3
+        return 0 <= byte < len(self._bits) and bool(self._bits[byte] & (1 << (right_id & 7)))
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        for byte, value in enumerate(self._bits):
+            if value:
+                base = byte << 3
+                for bit in range(8):
+                    if value & (1 << bit):
+                        yield base + bit
+
+    def __eq__(self, other):
+        if not isinstance(other, Selection):
+            return NotImplemented
+        return self._count == other._count and self.to_bytes() == other.to_bytes()
+
+    def to_bytes(self):
+        """The bitset with trailing zero bytes dropped, bit ``i`` = ID ``i``."""
+        return bytes(self._bits).rstrip(b"\0")
+
+    @classmethod
+    def from_bytes(cls, data):
+        sel = cls()
+        sel._bits = bytearray(data)
+        sel._count = int.from_bytes(data, "little").bit_count()
+        return sel
+
+    def __repr__(self):
+        return f"Selection({len(self)} ids)"
+
+# --- Undo / redo ---
+class SelectionLog:
+    """Undo and redo for a ``Selection``, kept as a log of deltas.
+
+    Changes go through the log, which records each one as the IDs it added
+    and the IDs it removed (two ints used as bitsets), so a step costs as
+    much as the change did, not a copy of the selection. Only the last
+    ``limit`` steps are kept; a new change clears the redo side.
+    """
+
+    def __init__(self, limit=100):
+        self._undo = deque(maxlen=limit)
+        self._redo = []
+
+    @property
+    def can_undo(self):
+        return bool(self._undo)
+
+    @property
+    def can_redo(self):
+        return bool(self._redo)
+
+    def _record(self, added, removed):
+        if added or removed:
+            self._undo.append((added, removed))
+            self._redo.clear()
+
+    def add(self, selection, right_id):
+        if right_id not in selection:
+            selection.add(right_id)
+            self._record(1 << right_id, 0)
+
+    def discard(self, selection, right_id):
+        if right_id in selection:
+            selection.discard(right_id)
+            self._record(0, 1 << right_id)
+
+    def apply(self, selection, op, ids):
+        """Run ``op(selection, ids)``, e.g. ``Selection.update``, as one step."""
+        before = selection._int()
+        op(selection, ids)
+        after = selection._int()
+        self._record(after & ~before, before & ~after)
+
+    def undo(self, selection):
+        """Revert the last step; False if there is none."""
+        if not self._undo:
+            return False
+        added, removed = self._undo.pop()
+        selection._set_int(selection._int() & ~added | removed)
+        self._redo.append((added, removed))
+        return True
+
+    def redo(self, selection):
+        """Reapply the last undone step; False if there is none."""
+        if not self._redo:
+            return False
+        added, removed = self._redo.pop()
+        selection._set_int(selection._int() & ~removed | added)
+        self._undo.append((added, removed))
+        return True
+
+# --- Shareable encoding ---
+# A selection plus the session's custom rights packed into one URL-safe
+# token: zlib over a small header, the bitset and the custom texts. The
+# stamp identifies the catalog the IDs refer to (see catalog_stamp), so a
+# link made against a different catalog is rejected instead of silently
+# selecting other rights.
+_TOKEN_FORMAT = 1
+_TOKEN_HEADER = struct.Struct("<BII")
+
+def catalog_stamp(version, seed, size, digest=0):
+    """32-bit tag for the catalog that right IDs are positions in.
+
+    ``digest`` is a checksum of the catalog's contents (``CatalogFile.digest``),
+    so the stamp changes when its rows do even if nothing else does.
+    """
+    return zlib.crc32(f"{version}:{seed}:{size}:{digest}".encode("utf-8"))
+
+def encode_state(selection, custom_rights, stamp):
+    bits = selection.to_bytes()
+    custom = "\n".join(custom_rights).encode("utf-8")
+    raw = _TOKEN_HEADER.pack(_TOKEN_FORMAT, stamp, len(bits)) + bits + custom
+    return base64.urlsafe_b64encode(zlib.compress(raw, 9)).rstrip(b"=").decode("ascii")
+
+def check_ids(selection, n_rights, custom_rights):
+    """Raise ValueError unless every ID is a catalog right or one of ``custom_rights``.
+
+    The stamp only says which catalog a selection was made against; IDs from
+    a crafted link or a damaged row could still point past its end.
+    """
+    limit = n_rights + len(custom_rights)
+    if selection._int().bit_length() > limit:
+        raise ValueError(f"selection refers to right {selection._int().bit_length() - 1}, "
+                         f"but there are only {limit}")
+
+def decode_state(token, stamp, n_rights):
+    """Inverse of encode_state. Raises ValueError for a malformed or foreign token.
+
+    ``n_rights`` is the size of the catalog the IDs are checked against.
+    """
+    try:
+        raw = zlib.decompress(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        fmt, token_stamp, n_bits = _TOKEN_HEADER.unpack_from(raw)
+    except (zlib.error, struct.error, binascii.Error) as e:
+        raise ValueError(f"malformed selection token: {e}") from None
+    if fmt != _TOKEN_FORMAT or token_stamp != stamp:
+        raise ValueError("selection token was made for a different catalog")
+    start = _TOKEN_HEADER.size
+    try:
+        custom = raw[start + n_bits:].decode("utf-8")
+    except UnicodeDecodeError as e:
+        raise ValueError(f"malformed selection token: {e}") from None
+    selection, custom = Selection.from_bytes(raw[start:start + n_bits]), custom.split("\n") if custom else []
+    check_ids(selection, n_rights, custom)
+    return selection, custom
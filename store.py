@@ -0,0 +1,102 @@
+"""SQLite-backed persistence for session selections.
+
+Each browser session is identified by an opaque id kept in the page URL, so
+a refresh, server restart or redeploy can restore its picks. Saves are
+write-behind: ``save()`` only replaces the pending snapshot for that session
+in memory, and a background thread writes all pending snapshots in one
+transaction every ``flush_interval`` seconds. A burst of checkbox clicks
+therefore costs one row write, not one per click.
+"""
+import atexit
+import json
+import sqlite3
+import threading
+import time
+
+from selection import Selection, check_ids
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS selections (
+    session_id TEXT PRIMARY KEY,
+    stamp      INTEGER NOT NULL,
+    bits       BLOB NOT NULL,
+    custom     TEXT NOT NULL,
+    updated    REAL NOT NULL
+)
+"""
+
+class SelectionStore:
+    """Selections and custom rights per session, flushed to SQLite in batches."""
+
+    def __init__(self, path, flush_interval=2.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+        self._db_lock = threading.Lock()
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._flush_loop, name="selection-store", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def save(self, session_id, selection, custom_rights, stamp):
+        """Queue a snapshot; only the latest one per session is written."""
+        row = (session_id, stamp, selection.to_bytes(), json.dumps(list(custom_rights)), time.time())
+        with self._pending_lock:
+            self._pending[session_id] = row
+
+    def load(self, session_id, stamp, n_rights):
+        """Return ``(Selection, custom_rights)``, or None if nothing usable is stored.
+
+        A row saved against a different catalog (another stamp) is ignored,
+        since its IDs would point at other rights, and so is one with IDs
+        past the ``n_rights`` catalog rights and its own custom rights.
+        """
+        with self._pending_lock:
+            row = self._pending.get(session_id)
+        if row is None:
+            with self._db_lock:
+                row = self._conn.execute(
+                    "SELECT session_id, stamp, bits, custom, updated FROM selections WHERE session_id = ?",
+                    (session_id,),
+                ).fetchone()
+        if row is None or row[1] != stamp:
+            return None
+        selection, custom = Selection.from_bytes(row[2]), json.loads(row[3])
+        try:
+            check_ids(selection, n_rights, custom)
+        except ValueError:
+            return None
+        return selection, custom
+
+    def flush(self):
+        """Write all pending snapshots now, in one transaction."""
+        with self._pending_lock:
+            rows, self._pending = list(self._pending.values()), {}
+        if not rows:
+            return 0
+        with self._db_lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO selections (session_id, stamp, bits, custom, updated) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+        return len(rows)
+
+    def _flush_loop(self):
+        while not self._wake.wait(self.flush_interval):
+            self.flush()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join()
+        self.flush()
+        with self._db_lock:
+            self._conn.close()
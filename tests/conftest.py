@@ -0,0 +1,10 @@
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# app_core reads the store path at import; keep test sessions out of the
+# real selections.db.
+os.environ["RIGHTS_STORE"] = os.path.join(tempfile.mkdtemp(prefix="rights_test_"), "selections.db")
@@ -0,0 +1,24 @@
+import os
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from conftest import ROOT
+
+@pytest.fixture(params=["app.py", "app_local.py"])
+def app(request):
+    return AppTest.from_file(os.path.join(ROOT, request.param), default_timeout=60).run()
+
+def test_punctuation_search_does_not_filter(app):
+    n_shown = len(app.checkbox)
+    app.text_input(key="grid_search").input("???").run()
+    assert not app.exception
+    assert len(app.checkbox) == n_shown
+
+def test_bulk_select_with_punctuation_search_selects_filter(app):
+    app.text_input(key="grid_search").input("???").run()
+    button = app.button(key="bulk_select")
+    n_filtered = int(button.label.split()[3])
+    button.click().run()
+    assert not app.exception
+    assert len(app.session_state.selection) == n_filtered > 0
@@ -0,0 +1,109 @@
+import csv
+import io
+import json
+import os
+import zipfile
+
+import pytest
+
+from bundle import create_bundle
+from contracts import ContractCache
+
+RIGHTS = ["Right to one (1) free coffee.", "Right to a nap."]
+
+def read_zip(bundle):
+    with bundle.open() as f:
+        data = f.read()
+    assert len(data) == bundle.size
+    return zipfile.ZipFile(io.BytesIO(data))
+
+def manifest_rows(zf):
+    return list(csv.DictReader(io.TextIOWrapper(zf.open("manifest.csv"), encoding="utf-8")))
+
+def test_bundle_holds_each_contract_and_manifest():
+    bundle = create_bundle(RIGHTS, "2026-01-01", manifest=[(4, "Foodie"), (340, "Custom")],
+                           contracts=("html", ("pdf", {"signer": "Sree Krishna"})))
+    try:
+        zf = read_zip(bundle)
+        assert zf.namelist() == ["Friendship_Contract_2026.html", "Friendship_Contract_2026.pdf",
+                                 "manifest.json", "manifest.csv"]
+        assert zf.read("Friendship_Contract_2026.pdf").startswith(b"%PDF")
+        manifest = json.loads(zf.read("manifest.json"))
+        assert manifest["count"] == 2
+        assert [c["signer"] for c in manifest["contracts"]] == ["Idiot Scientist", "Sree Krishna"]
+        assert [r["id"] for r in manifest["rights"]] == [4, 340]
+        assert manifest_rows(zf) == [
+            {"number": "1", "id": "4", "category": "Foodie", "text": RIGHTS[0]},
+            {"number": "2", "id": "340", "category": "Custom", "text": RIGHTS[1]},
+        ]
+    finally:
+        bundle.discard()
+
+def test_bundle_copies_rendered_contracts():
+    rendered = []
+
+    def render(kind, options):
+        rendered.append((kind, options))
+        return f"<{kind} {options.get('signer')}>"
+
+    bundle = create_bundle(RIGHTS, "2026-01-01", contracts=(("html", (("signer", "X"),)),), render=render)
+    try:
+        zf = read_zip(bundle)
+        assert rendered == [("html", {"signer": "X"})]
+        assert zf.read("Friendship_Contract_2026.html") == b"<html X>"
+        assert json.loads(zf.read("manifest.json"))["contracts"][0]["signer"] == "X"
+    finally:
+        bundle.discard()
+
+def test_bundle_readers_seek_independently():
+    bundle = create_bundle(RIGHTS, "2026-01-01", contracts=("html",))
+    try:
+        a, b = bundle.open(), bundle.open()
+        a.seek(10)
+        assert b.read(4) == b"PK\x03\x04"
+        assert a.tell() == 10
+        a.close()
+        b.close()
+    finally:
+        bundle.discard()
+
+def test_cached_bundle_is_keyed_by_manifest():
+    import app_core
+
+    options = app_core.contract_options("bundle", {"html": {}, "bundle": {}})
+    first = app_core.build_contract("bundle", RIGHTS[:1], options, manifest=[(0, "Legacy")])
+    second = app_core.build_contract("bundle", RIGHTS[:1], options, manifest=[(340, "Custom")])
+    assert first is not second
+    assert manifest_rows(read_zip(second))[0]["category"] == "Custom"
+
+def test_discard_waits_for_open_readers():
+    bundle = create_bundle(RIGHTS, "2026-01-01", contracts=("html",))
+    reader = bundle.open()
+    first = reader.read(100)
+    bundle.discard()
+    rest = reader.read()
+    assert len(first) + len(rest) == bundle.size
+    reader.close()
+    assert bundle._spool.closed
+    with pytest.raises(ValueError):
+        bundle.open()
+
+def test_pdf_file_is_removed_after_its_last_reader(tmp_path):
+    from pdf_stream import create_pdf_file
+
+    pdf = create_pdf_file(RIGHTS, "2026-01-01")
+    reader = pdf.open()
+    pdf.discard()
+    assert os.path.exists(pdf.path)
+    assert reader.read().startswith(b"%PDF")
+    reader.close()
+    assert not os.path.exists(pdf.path)
+
+def test_cache_opens_reader_before_eviction():
+    cache = ContractCache(max_entries=1, on_evict=lambda value: value.discard())
+    bundle = create_bundle(RIGHTS, "2026-01-01", contracts=("html",))
+    reader = cache.get_or_build("a", lambda: bundle, use=lambda value: value.open())
+    cache.get_or_build("b", lambda: b"other")
+    with reader:
+        assert reader.read(4) == b"PK\x03\x04"
+    assert bundle._spool.closed
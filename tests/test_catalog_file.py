@@ -0,0 +1,57 @@
+import os
+
+import pytest
+
+from catalog import Catalog, CatalogIndex, build_catalog
+from catalog_file import CatalogFile, catalog_path, open_catalog, write_catalog_file
+from selection import catalog_stamp
+
+ROWS = [
+    {"category": "Romance", "text": "Right to a picnic."},
+    {"category": "Foodie", "text": "Right to the last slice."},
+    {"category": "Romance", "text": "Right to a picnic."},
+    {"category": "Foodie", "text": "Right to a picnic."},
+    {"category": "Geek", "text": "Право на кофе."},
+]
+
+def test_round_trip_keeps_rows_and_index(tmp_path):
+    path = str(tmp_path / "c.rcat")
+    write_catalog_file(path, ROWS, version=9, seed=4)
+    cf = CatalogFile(path)
+    assert (cf.version, cf.seed, len(cf)) == (9, 4, len(ROWS))
+    assert [dict(r) for r in cf] == ROWS
+    assert list(cf.texts()) == [r["text"] for r in ROWS]
+
+    stored, scanned = cf.catalog_index(), CatalogIndex(Catalog(ROWS))
+    assert list(stored.canonical) == list(scanned.canonical) == [0, 1, 0, 0, 4]
+    assert stored.categories == scanned.categories == ("Foodie", "Geek", "Romance")
+    for cat in stored.categories:
+        assert list(stored.by_category[cat]) == list(scanned.by_category[cat])
+    assert list(stored.positions(stored.categories)) == list(scanned.positions(scanned.categories))
+
+def test_digest_follows_the_rows(tmp_path):
+    def digest(rows, name):
+        path = str(tmp_path / name)
+        write_catalog_file(path, rows)
+        return CatalogFile(path).digest
+
+    same = digest(ROWS, "a.rcat")
+    assert digest(list(ROWS), "b.rcat") == same
+    swapped = [ROWS[1], ROWS[0]] + ROWS[2:]
+    assert digest(swapped, "c.rcat") != same
+    assert catalog_stamp(3, 2026, len(ROWS), same) != catalog_stamp(3, 2026, len(ROWS), digest(swapped, "d.rcat"))
+
+def test_packed_catalog_matches_build(tmp_path):
+    cf = open_catalog(size=500, data_dir=str(tmp_path))
+    assert cf.path == catalog_path(size=500, data_dir=str(tmp_path))
+    built = build_catalog(size=500)
+    assert [dict(r) for r in cf] == [dict(r) for r in built]
+
+def test_unreadable_file_is_rebuilt(tmp_path):
+    path = catalog_path(size=50, data_dir=str(tmp_path))
+    with open(path, "wb") as f:
+        f.write(b"RCAT\x01\x00")
+    with pytest.raises(ValueError):
+        CatalogFile(path)
+    assert len(open_catalog(size=50, data_dir=str(tmp_path))) == 50
+    assert os.path.getsize(path) > 6
@@ -0,0 +1,45 @@
+from catalog import build_catalog, hand_written_rights
+from dedupe import NearDuplicates, canonical_rights, jaccard, normalize
+
+TEXTS = [
+    "Right to share a Netflix password for one month.",
+    "Right to one free coffee, on me.",
+    "Right to share the Netflix password for one (1) month!",
+    "Right to a karaoke duet.",
+    "Right to one (1) free coffee or bubble tea, on me.",
+]
+
+def test_normalize_drops_case_punctuation_and_stopwords():
+    assert normalize("Right to a KARAOKE duet!") == frozenset({"karaoke", "duet"})
+    assert normalize("Ｋａｒａｏｋｅ") == frozenset({"karaoke"})  # NFKC
+    assert jaccard(frozenset(), frozenset()) == 1.0
+
+def test_near_duplicates_join_the_first_kept_text():
+    clusters = NearDuplicates(TEXTS)
+    assert list(clusters.representative) == [0, 1, 0, 3, 1]
+    assert clusters.kept == [0, 1, 3]
+    assert clusters.similarity == {2: 5 / 6, 4: 0.5}
+
+def test_threshold_and_near_misses():
+    clusters = NearDuplicates(TEXTS, threshold=0.9, review_threshold=0.3)
+    assert clusters.kept == [0, 1, 2, 3, 4]
+    assert [(a, b) for _, a, b in clusters.near_misses] == [(0, 2), (1, 4)]
+
+def test_report_lists_clusters():
+    rights = [{"category": "Media", "text": t} for t in TEXTS]
+    report = NearDuplicates(TEXTS).report(rights)
+    assert (report["rights"], report["kept"]) == (5, 3)
+    assert [c["kept"]["position"] for c in report["clusters"]] == [0, 1]
+    assert [m["position"] for m in report["clusters"][1]["merged"]] == [4]
+
+def test_same_clusters_every_run():
+    texts = [r["text"] for r in build_catalog(size=3000, dedupe=False)]
+    assert list(NearDuplicates(texts).representative) == list(NearDuplicates(texts).representative)
+
+def test_catalog_keeps_only_canonical_hand_written_rights():
+    rights = hand_written_rights()
+    kept = canonical_rights(rights)
+    assert 0 < len(kept) < len(rights)
+    catalog_texts = {r["text"] for r in build_catalog()}
+    assert all(r["text"] in catalog_texts for r in kept)
+    assert NearDuplicates([r["text"] for r in kept]).kept == list(range(len(kept)))
@@ -0,0 +1,78 @@
+import threading
+import time
+
+import pytest
+
+from exports import ExportPool
+
+@pytest.fixture
+def pool():
+    pool = ExportPool(max_workers=1)
+    yield pool
+    pool.shutdown()
+
+def wait(job, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not job.finished:
+        assert time.monotonic() < deadline, f"job still {job.state}"
+        time.sleep(0.005)
+
+def test_job_reports_progress_and_finishes(pool):
+    seen = []
+
+    def build(progress):
+        for i in range(1, 4):
+            progress(i)
+            seen.append(i)
+        return "contract"
+
+    job = pool.submit("html", 10, build)
+    wait(job)
+    assert job.state == "done"
+    assert seen == [1, 2, 3]
+    assert job.done == job.total and job.fraction == 1.0
+    assert not hasattr(job, "result")
+
+def test_cancel_stops_a_running_job_at_its_next_progress_call(pool):
+    started, release = threading.Event(), threading.Event()
+    reached = []
+
+    def build(progress):
+        progress(1)
+        started.set()
+        release.wait(5)
+        progress(2)
+        reached.append(2)
+
+    job = pool.submit("pdf", 5, build)
+    assert started.wait(5)
+    job.cancel()
+    release.set()
+    wait(job)
+    assert job.state == "cancelled"
+    assert job.done == 1 and reached == []
+
+def test_cancel_a_queued_job(pool):
+    release = threading.Event()
+    running = pool.submit("pdf", 1, lambda progress: release.wait(5))
+    queued = pool.submit("html", 1, lambda progress: pytest.fail("cancelled job ran"))
+    queued.cancel()
+    assert queued.state == "cancelled" and queued.finished
+    release.set()
+    wait(running)
+    assert running.state == "done"
+
+def test_failed_job_keeps_its_error(pool):
+    def build(progress):
+        raise RuntimeError("font missing")
+
+    job = pool.submit("pdf", 3, build)
+    wait(job)
+    assert job.state == "failed"
+    assert str(job.error) == "font missing"
+
+def test_cancelling_a_finished_job_keeps_it_done(pool):
+    job = pool.submit("html", 0, lambda progress: None)
+    wait(job)
+    job.cancel()
+    assert job.state == "done" and job.fraction == 1.0
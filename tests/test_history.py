@@ -0,0 +1,58 @@
+import os
+
+from streamlit.testing.v1 import AppTest
+
+from conftest import ROOT
+from selection import Selection, SelectionLog
+
+def test_log_undo_redo():
+    sel, log = Selection(), SelectionLog()
+    log.add(sel, 2)
+    log.apply(sel, Selection.update, Selection([5, 6]))
+    log.discard(sel, 2)
+    assert list(sel) == [5, 6]
+    assert log.undo(sel) and list(sel) == [2, 5, 6]
+    assert log.undo(sel) and list(sel) == [2]
+    assert log.redo(sel) and list(sel) == [2, 5, 6]
+    assert log.undo(sel) and log.undo(sel) and len(sel) == 0
+    assert not log.undo(sel)
+    assert log.redo(sel) and list(sel) == [2]
+
+def test_log_new_change_clears_redo_and_noops_are_not_steps():
+    sel, log = Selection([1]), SelectionLog()
+    log.add(sel, 1)
+    log.discard(sel, 9)
+    assert not log.can_undo
+    log.add(sel, 3)
+    log.undo(sel)
+    log.add(sel, 4)
+    assert not log.can_redo
+    assert not log.redo(sel)
+    assert list(sel) == [1, 4]
+
+def test_log_keeps_only_the_last_steps():
+    sel, log = Selection(), SelectionLog(limit=3)
+    for i in range(5):
+        log.add(sel, i)
+    while log.undo(sel):
+        pass
+    assert list(sel) == [0, 1]
+
+def test_undo_redo_in_the_app():
+    at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=60).run()
+    box = at.checkbox[0]
+    box.check().run()
+    at.button(key="bulk_select").click().run()
+    n_all = len(at.session_state.selection)
+    at.button(key="history_undo").click().run()
+    assert list(at.session_state.selection) == [int(box.key[len("right_"):])]
+    assert at.checkbox(key=box.key).value
+    at.button(key="history_undo").click().run()
+    assert len(at.session_state.selection) == 0
+    assert not at.checkbox(key=box.key).value
+    at.button(key="history_undo").click().run()
+    assert [t.value for t in at.toast] == ["Nothing to undo."]
+    at.button(key="history_redo").click().run()
+    at.button(key="history_redo").click().run()
+    assert len(at.session_state.selection) == n_all
+    assert not at.exception
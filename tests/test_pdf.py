@@ -0,0 +1,39 @@
+import io
+
+import pytest
+
+from contracts import create_pdf
+from pdf_stream import create_pdf_file
+
+pypdf = pytest.importorskip("pypdf")
+
+RIGHTS = [
+    "Right to one (1) free coffee, on me.",
+    "Право на кофе в любое время.",
+    "Δικαίωμα για καφέ?",
+    "Right to ask \"why?\" ... and get an answer?",
+]
+
+def extract(data):
+    reader = pypdf.PdfReader(io.BytesIO(data), strict=True)
+    return "".join(page.extract_text() for page in reader.pages), len(reader.pages)
+
+def test_pdf_parses_strictly_and_keeps_text():
+    text, _ = extract(create_pdf(RIGHTS, "2026-01-01", signer="Çağrı Øre"))
+    for right in RIGHTS:
+        assert right in text
+    assert "Çağrı Øre" in text
+    assert "2026-01-01" in text
+
+def test_streamed_pdf_file_spans_pages():
+    rights = [f"Право номер {i}?" for i in range(300)]
+    pdf = create_pdf_file(rights, "2026-01-01")
+    try:
+        with pdf.open() as f:
+            data = f.read()
+    finally:
+        pdf.discard()
+    assert len(data) == pdf.size
+    text, pages = extract(data)
+    assert pages > 1
+    assert "300. Право номер 299?" in text
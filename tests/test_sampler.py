@@ -0,0 +1,57 @@
+import random
+from collections import Counter
+
+import pytest
+
+from catalog import Catalog, CatalogIndex, build_catalog
+from sampler import AliasTable, draw_rights
+from selection import Selection
+
+@pytest.fixture(scope="module")
+def catalog():
+    return build_catalog(size=20_000)
+
+@pytest.fixture(scope="module")
+def index(catalog):
+    return CatalogIndex(catalog)
+
+def test_alias_table_follows_weights():
+    table, rng = AliasTable([3, 1, 0, 6]), random.Random(1)
+    counts = Counter(table.sample(rng) for _ in range(50_000))
+    assert counts[2] == 0
+    assert abs(counts[0] / 50_000 - 0.3) < 0.01
+    assert abs(counts[3] / 50_000 - 0.6) < 0.01
+    with pytest.raises(ValueError):
+        AliasTable([0, 0])
+
+def test_draw_is_distinct_and_weighted_by_category_share(catalog, index):
+    drawn = draw_rights(index, {"Romance": 3, "Foodie": 1}, 400, seed=5)
+    assert len(drawn) == len(set(drawn)) == 400
+    counts = Counter(catalog[i]["category"] for i in drawn)
+    assert set(counts) == {"Romance", "Foodie"}
+    assert 0.65 < counts["Romance"] / 400 < 0.85
+    assert all(index.canonical[i] == i for i in drawn)
+
+def test_same_seed_same_draw(index):
+    weights = {c: 1 for c in index.categories}
+    assert draw_rights(index, weights, 25, seed=7) == draw_rights(index, weights, 25, seed=7)
+    assert draw_rights(index, weights, 25, seed=7) != draw_rights(index, weights, 25, seed=8)
+
+def test_selected_rights_are_skipped(index):
+    weights = {"Media": 1}
+    taken = Selection(draw_rights(index, weights, 50, seed=1))
+    drawn = draw_rights(index, weights, 50, seed=1, exclude=taken)
+    assert len(drawn) == 50
+    assert not set(drawn) & set(taken)
+
+def test_exhausted_categories_drop_out():
+    rows = [{"category": "A", "text": f"a{i}"} for i in range(3)] + \
+           [{"category": "B", "text": f"b{i}"} for i in range(50)] + \
+           [{"category": "A", "text": "b0"}]
+    index = CatalogIndex(Catalog(rows))
+    drawn = draw_rights(index, {"A": 100, "B": 1}, 10, seed=3)
+    assert len(drawn) == 10
+    assert {0, 1, 2} <= set(drawn)
+    # Small pools run dry: every distinct right, the repeated text once.
+    assert sorted(draw_rights(index, {"A": 1}, 10, seed=3)) == [0, 1, 2, 3]
+    assert draw_rights(index, {"A": 0, "C": 5}, 10) == []
@@ -0,0 +1,48 @@
+import pytest
+
+from search import SearchIndex, within_distance
+
+TEXTS = [
+    "Right to a 'karaoke duet' (if we're brave).",
+    "Right to a piggyback ride.",
+    "Right to go stargazing, no questions asked.",
+    "Right to choose the karaoke song.",
+    "Right to one (1) free coffee.",
+]
+
+@pytest.fixture
+def index():
+    return SearchIndex(TEXTS)
+
+def test_prefix_matches_in_catalog_order(index):
+    assert index.search("kara") == (0, 3)
+    assert index.search("Piggy") == (1,)
+
+def test_every_word_must_match(index):
+    assert index.search("karaoke song") == (3,)
+    assert index.search("karaoke coffee") == ()
+
+@pytest.mark.parametrize("query, expected", [
+    ("karaoki", (0, 3)),       # substitution
+    ("piggyback", (1,)),
+    ("piggybak", (1,)),        # deletion
+    ("stargazzing", (2,)),     # insertion
+    ("karoake", (0, 3)),       # adjacent swap
+    ("stargaizng", (2,)),      # swap
+])
+def test_typos(index, query, expected):
+    assert index.search(query) == expected
+
+def test_short_words_need_exact_prefixes(index):
+    assert index.search("cfo") == ()
+
+def test_query_without_words_is_no_filter(index):
+    assert index.search("") is None
+    assert index.search("???") is None
+
+def test_within_distance():
+    assert within_distance("karoake", "karaoke", 1)
+    assert not within_distance("karoake", "karaoke", 0)
+    assert within_distance("kitten", "sitting", 3)
+    assert not within_distance("kitten", "sitting", 2)
+    assert not within_distance("abc", "cab", 1)
@@ -0,0 +1,23 @@
+import pytest
+
+from selection import Selection
+
+def test_negative_ids_are_rejected():
+    sel = Selection([1, 9])
+    with pytest.raises(ValueError):
+        sel.add(-1)
+    with pytest.raises(ValueError):
+        Selection([3, -1])
+    assert -1 not in sel
+    sel.discard(-1)
+    assert list(sel) == [1, 9]
+
+def test_bitset_order_and_counts():
+    sel = Selection([40, 3, 3, 17])
+    assert list(sel) == [3, 17, 40]
+    assert len(sel) == 3
+    sel.symmetric_difference_update([3, 5])
+    assert list(sel) == [5, 17, 40]
+    sel.difference_update(Selection([17, 99]))
+    assert list(sel) == [5, 40]
+    assert Selection.from_bytes(sel.to_bytes()) == sel
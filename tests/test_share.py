@@ -0,0 +1,66 @@
+import pytest
+
+from selection import Selection, catalog_stamp, decode_state, encode_state
+from store import SelectionStore
+
+def test_share_token_round_trip():
+    sel = Selection([0, 7, 8, 1000])
+    custom = ["Right to a nap ☕", "Right to \"quotes\" & ümlauts"]
+    token = encode_state(sel, custom, stamp=123)
+    assert token.isascii() and "=" not in token
+    restored, restored_custom = decode_state(token, stamp=123, n_rights=1000)
+    assert restored == sel
+    assert restored_custom == custom
+    assert decode_state(encode_state(Selection(), [], 5), 5, 0) == (Selection(), [])
+
+def test_share_token_from_another_catalog_is_rejected():
+    token = encode_state(Selection([1]), [], stamp=catalog_stamp(3, 2026, 340, 1))
+    with pytest.raises(ValueError, match="different catalog"):
+        decode_state(token, stamp=catalog_stamp(3, 2026, 340, 2), n_rights=340)
+
+@pytest.mark.parametrize("token", ["", "not a token!", "AAAA", encode_state(Selection([1]), [], 1)[:-4]])
+def test_malformed_share_token(token):
+    with pytest.raises(ValueError):
+        decode_state(token, stamp=1, n_rights=340)
+
+def test_share_token_ids_must_exist():
+    token = encode_state(Selection([1, 400]), [], stamp=1)
+    with pytest.raises(ValueError, match="right 400"):
+        decode_state(token, stamp=1, n_rights=340)
+    # Custom rights are numbered after the catalog.
+    token = encode_state(Selection([1, 340]), ["mine"], stamp=1)
+    assert list(decode_state(token, stamp=1, n_rights=340)[0]) == [1, 340]
+
+@pytest.fixture
+def store(tmp_path):
+    store = SelectionStore(str(tmp_path / "selections.db"), flush_interval=3600)
+    yield store
+    store.close()
+
+def test_store_serves_pending_then_flushed_rows(store):
+    store.save("a", Selection([1, 2]), ["x"], stamp=7)
+    store.save("a", Selection([3]), ["x"], stamp=7)
+    assert store.load("a", 7, 340) == (Selection([3]), ["x"])
+    assert store.flush() == 1
+    assert store.flush() == 0
+    assert store.load("a", 7, 340) == (Selection([3]), ["x"])
+    assert store.load("b", 7, 340) is None
+
+def test_store_survives_reopen(tmp_path):
+    path = str(tmp_path / "selections.db")
+    store = SelectionStore(path, flush_interval=3600)
+    store.save("a", Selection([5]), [], stamp=7)
+    store.close()
+    store = SelectionStore(path, flush_interval=3600)
+    try:
+        assert store.load("a", 7, 340) == (Selection([5]), [])
+    finally:
+        store.close()
+
+def test_store_ignores_foreign_or_out_of_range_rows(store):
+    store.save("a", Selection([5]), [], stamp=7)
+    assert store.load("a", 8, 340) is None
+    store.save("b", Selection([400]), [], stamp=7)
+    assert store.load("b", 7, 340) is None
+    store.save("c", Selection([340]), ["mine"], stamp=7)
+    assert store.load("c", 7, 340) == (Selection([340]), ["mine"])
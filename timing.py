@@ -0,0 +1,97 @@
+"""Opt-in per-phase timing for the app and the exporters.
+
+A ``PhaseTimer`` belongs to one session. Code wraps each phase of a script
+run in ``timer.phase(name)``; the phases of one run (a full run, or a single
+fragment rerun) are grouped into a record that is kept for the debug
+sidebar and appended to a JSON-lines log.
+
+When instrumentation is off the app uses ``NULL_TIMER`` instead, whose
+``run()`` and ``phase()`` return one shared no-op context manager, so the
+disabled path costs an attribute lookup and a ``with`` per phase.
+"""
+import json
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+_log_lock = threading.Lock()
+
+class PhaseTimer:
+    """Collects phase durations for one session.
+
+    Each phase is logged as one JSON line::
+
+        {"ts": ..., "session": ..., "run": 12, "kind": "grid", "phase": "render_grid",
+         "ms": 4.1, "counts": {"widgets": 60}}
+    """
+
+    enabled = True
+
+    def __init__(self, log_path, keep=20, session_id=None):
+        self.session_id = session_id or uuid.uuid4().hex[:12]
+        self.log_path = log_path
+        self.runs = deque(maxlen=keep)
+        self._run_count = 0
+        self._pending = []
+        self._local = threading.local()
+
+    @contextmanager
+    def run(self, kind):
+        """Group the phases inside into one run; nested calls join the outer run."""
+        if getattr(self._local, "run", None) is not None:
+            yield
+            return
+        self._run_count += 1
+        record = {"run": self._run_count, "kind": kind, "ts": time.time(), "phases": self._pending}
+        self._pending = []
+        self._local.run = record
+        try:
+            yield
+        finally:
+            self._local.run = None
+            self.runs.append(record)
+            self._write(record)
+
+    @contextmanager
+    def phase(self, name, **counts):
+        """Time the block; the yielded dict takes item counts known only at the end.
+
+        A phase outside any run (e.g. module-level setup before ``main()``)
+        is held back and reported with the next run.
+        """
+        start = time.perf_counter()
+        try:
+            yield counts
+        finally:
+            ms = (time.perf_counter() - start) * 1000
+            run = getattr(self._local, "run", None)
+            phases = run["phases"] if run is not None else self._pending
+            phases.append({"phase": name, "ms": round(ms, 3), "counts": counts})
+
+    def _write(self, record):
+        if not self.log_path:
+            return
+        lines = [
+            json.dumps({
+                "ts": record["ts"], "session": self.session_id, "run": record["run"],
+                "kind": record["kind"], **p,
+            })
+            for p in record["phases"]
+        ]
+        with _log_lock, open(self.log_path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+class _NullTimer:
+    enabled = False
+    runs = ()
+    _noop = nullcontext({})
+
+    def run(self, kind):
+        return self._noop
+
+    def phase(self, name, **counts):
+        return self._noop
+
+NULL_TIMER = _NullTimer()
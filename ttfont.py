@@ -0,0 +1,251 @@
+"""TrueType fonts for the PDF exporter: metrics, character mapping, subsetting.
+
+A font file is parsed once per process (``load_font`` is memoized) into the
+few tables the exporter needs: advance widths, the Unicode to glyph map and
+the raw glyph outlines. Each document then embeds only the glyphs it used:
+``subset()`` rebuilds a minimal font program with those glyphs (plus the
+components of composite glyphs) at their original glyph IDs, so the PDF can
+address glyphs by ID through an identity CID map. Subsets are memoized too,
+since most contracts use the same few dozen Latin glyphs.
+"""
+import functools
+import os
+import struct
+
+FONT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fonts")
+
+# Tables copied into a subset as they are; hinting programs are kept
+# because glyph instructions refer to them.
+_PASSTHROUGH = (b"cvt ", b"fpgm", b"prep")
+
+# Composite glyph component flags.
+_ARG_WORDS, _HAS_SCALE, _MORE, _XY_SCALE, _TWO_BY_TWO = 0x1, 0x8, 0x20, 0x40, 0x80
+
+def _checksum(data):
+    data += bytes(-len(data) % 4)
+    return sum(struct.unpack(f">{len(data) // 4}I", data)) & 0xFFFFFFFF
+
+class TrueTypeFont:
+    """The parts of a TrueType font the PDF writer needs. Read-only once built."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self.data = f.read()
+        num_tables = struct.unpack_from(">H", self.data, 4)[0]
+        self.tables = {}
+        for i in range(num_tables):
+            tag, _, offset, length = struct.unpack_from(">4sIII", self.data, 12 + 16 * i)
+            self.tables[tag] = (offset, length)
+
+        head = self.table(b"head")
+        self.units_per_em = struct.unpack_from(">H", head, 18)[0]
+        self.bbox = struct.unpack_from(">4h", head, 36)
+        long_loca = struct.unpack_from(">h", head, 50)[0] == 1
+        hhea = self.table(b"hhea")
+        self.ascent, self.descent = struct.unpack_from(">hh", hhea, 4)
+        self.num_hmetrics = struct.unpack_from(">H", hhea, 34)[0]
+        self.num_glyphs = struct.unpack_from(">H", self.table(b"maxp"), 4)[0]
+
+        post = self.table(b"post")
+        self.italic_angle = struct.unpack_from(">i", post, 4)[0] / 65536
+        os2 = self.table(b"OS/2")
+        version, self.weight = struct.unpack_from(">HxxH", os2, 0)
+        self.name = self._postscript_name() or os.path.splitext(os.path.basename(path))[0]
+
+        hmtx = self.table(b"hmtx")
+        advances = list(struct.unpack_from(f">{2 * self.num_hmetrics}H", hmtx)[0::2])
+        advances += [advances[-1]] * (self.num_glyphs - self.num_hmetrics)
+        scale = 1000 / self.units_per_em
+        self.widths = [round(a * scale) for a in advances]
+
+        loca = self.table(b"loca")
+        fmt, mult = (">%dI", 1) if long_loca else (">%dH", 2)
+        self.loca = [o * mult for o in struct.unpack_from(fmt % (self.num_glyphs + 1), loca)]
+        self.cmap = self._parse_cmap()
+        self._char_widths = {}
+        if version >= 2:
+            self.cap_height = struct.unpack_from(">h", os2, 88)[0]
+        else:
+            # Older OS/2 tables have no cap height; use the top of "H".
+            h = self._glyph(self.glyph_id("H"))
+            self.cap_height = struct.unpack_from(">h", h, 8)[0] if h else self.ascent
+
+    def table(self, tag):
+        offset, length = self.tables[tag]
+        return self.data[offset:offset + length]
+
+    # --- Parsing ---
+    def _postscript_name(self):
+        if b"name" not in self.tables:
+            return None
+        name = self.table(b"name")
+        count, strings = struct.unpack_from(">xxHH", name, 0)
+        for i in range(count):
+            platform, encoding, _, name_id, length, offset = struct.unpack_from(">6H", name, 6 + 12 * i)
+            if name_id != 6:
+                continue
+            raw = name[strings + offset:strings + offset + length]
+            return raw.decode("utf-16-be" if platform == 3 else "latin-1")
+        return None
+
+    def _parse_cmap(self):
+        cmap = self.table(b"cmap")
+        subtables = {}
+        for i in range(struct.unpack_from(">H", cmap, 2)[0]):
+            platform, encoding, offset = struct.unpack_from(">HHI", cmap, 4 + 8 * i)
+            subtables[(platform, encoding)] = offset
+        for key in ((3, 10), (0, 4), (3, 1), (0, 3)):
+            if key not in subtables:
+                continue
+            offset = subtables[key]
+            fmt = struct.unpack_from(">H", cmap, offset)[0]
+            if fmt == 12:
+                return self._cmap_format12(cmap, offset)
+            if fmt == 4:
+                return self._cmap_format4(cmap, offset)
+        raise ValueError(f"{self.path}: no Unicode cmap subtable")
+
+    @staticmethod
+    def _cmap_format4(cmap, offset):
+        seg_count = struct.unpack_from(">H", cmap, offset + 6)[0] // 2
+        ends = struct.unpack_from(f">{seg_count}H", cmap, offset + 14)
+        starts_at = offset + 16 + 2 * seg_count
+        starts = struct.unpack_from(f">{seg_count}H", cmap, starts_at)
+        deltas = struct.unpack_from(f">{seg_count}h", cmap, starts_at + 2 * seg_count)
+        ranges_at = starts_at + 4 * seg_count
+        ranges = struct.unpack_from(f">{seg_count}H", cmap, ranges_at)
+        mapping = {}
+        for seg in range(seg_count):
+            start, end, delta, range_offset = starts[seg], ends[seg], deltas[seg], ranges[seg]
+            if start == 0xFFFF:
+                continue
+            for code in range(start, end + 1):
+                if range_offset == 0:
+                    gid = (code + delta) & 0xFFFF
+                else:
+                    at = ranges_at + 2 * seg + range_offset + 2 * (code - start)
+                    gid = struct.unpack_from(">H", cmap, at)[0]
+                    if gid:
+                        gid = (gid + delta) & 0xFFFF
+                if gid:
+                    mapping[code] = gid
+        return mapping
+
+    @staticmethod
+    def _cmap_format12(cmap, offset):
+        groups = struct.unpack_from(">I", cmap, offset + 12)[0]
+        mapping = {}
+        for i in range(groups):
+            start, end, gid = struct.unpack_from(">3I", cmap, offset + 16 + 12 * i)
+            for code in range(start, end + 1):
+                mapping[code] = gid + code - start
+        return mapping
+
+    # --- Metrics ---
+    def glyph_id(self, char):
+        """Glyph for ``char``; 0 (the missing-glyph box) if the font lacks it."""
+        return self.cmap.get(ord(char), 0)
+
+    def char_width(self, char):
+        """Advance width of ``char`` in thousandths of the font size."""
+        w = self._char_widths.get(char)
+        if w is None:
+            w = self._char_widths[char] = self.widths[self.glyph_id(char)]
+        return w
+
+    def char_widths(self, text):
+        """A dict of advance widths covering at least every character in ``text``.
+
+        Meant for layout loops, which can then index it directly.
+        """
+        for char in set(text).difference(self._char_widths):
+            self.char_width(char)
+        return self._char_widths
+
+    # --- Subsetting ---
+    def _glyph(self, gid):
+        offset, _ = self.tables[b"glyf"]
+        return self.data[offset + self.loca[gid]:offset + self.loca[gid + 1]]
+
+    def _with_components(self, gids):
+        todo, seen = list(gids), set()
+        while todo:
+            gid = todo.pop()
+            if gid in seen:
+                continue
+            seen.add(gid)
+            glyph = self._glyph(gid)
+            if len(glyph) < 10 or struct.unpack_from(">h", glyph, 0)[0] >= 0:
+                continue
+            pos = 10
+            while True:
+                flags, component = struct.unpack_from(">HH", glyph, pos)
+                todo.append(component)
+                pos += 4 + (4 if flags & _ARG_WORDS else 2)
+                if flags & _HAS_SCALE:
+                    pos += 2
+                elif flags & _XY_SCALE:
+                    pos += 4
+                elif flags & _TWO_BY_TWO:
+                    pos += 8
+                if not flags & _MORE:
+                    break
+        return seen
+
+    @functools.lru_cache(maxsize=64)
+    def subset(self, gids):
+        """A font program holding only ``gids`` (a frozenset), at their original IDs."""
+        keep = self._with_components(gids | {0})
+        count = max(keep) + 1
+        glyf, loca = bytearray(), []
+        for gid in range(count):
+            loca.append(len(glyf))
+            if gid in keep:
+                glyf += self._glyph(gid)
+                glyf += bytes(-len(glyf) % 4)
+        loca.append(len(glyf))
+
+        head = bytearray(self.table(b"head"))
+        struct.pack_into(">I", head, 8, 0)    # checkSumAdjustment, left unset
+        struct.pack_into(">h", head, 50, 1)   # long loca offsets
+        maxp = bytearray(self.table(b"maxp"))
+        struct.pack_into(">H", maxp, 4, count)
+        hhea = bytearray(self.table(b"hhea"))
+        n_hmetrics = min(self.num_hmetrics, count)
+        struct.pack_into(">H", hhea, 34, n_hmetrics)
+        hmtx = self.table(b"hmtx")[:4 * n_hmetrics + 2 * (count - n_hmetrics)]
+
+        tables = {
+            b"glyf": bytes(glyf),
+            b"head": bytes(head),
+            b"hhea": bytes(hhea),
+            b"hmtx": hmtx,
+            b"loca": struct.pack(f">{len(loca)}I", *loca),
+            b"maxp": bytes(maxp),
+        }
+        for tag in _PASSTHROUGH:
+            if tag in self.tables:
+                tables[tag] = self.table(tag)
+        return _build_sfnt(tables)
+
+def _build_sfnt(tables):
+    tags = sorted(tables)
+    n = len(tags)
+    search_range = 1 << (n.bit_length() - 1)
+    header = struct.pack(">IHHHH", 0x00010000, n, search_range * 16,
+                         search_range.bit_length() - 1, n * 16 - search_range * 16)
+    directory, body = [], []
+    offset = 12 + 16 * n
+    for tag in tags:
+        data = tables[tag]
+        directory.append(struct.pack(">4sIII", tag, _checksum(data), offset, len(data)))
+        padded = data + bytes(-len(data) % 4)
+        body.append(padded)
+        offset += len(padded)
+    return header + b"".join(directory) + b"".join(body)
+
+@functools.lru_cache(maxsize=None)
+def load_font(name):
+    """Parse ``fonts/<name>.ttf`` once per process."""
+    return TrueTypeFont(os.path.join(FONT_DIR, f"{name}.ttf"))